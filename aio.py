@@ -0,0 +1,69 @@
+import asyncio
+from flask import current_app, g
+
+# Async database access for the ASGI mode (asgi.py). A page whose queries
+# don't depend on each other hands them to fetch_all(), which then runs them
+# concurrently on the server's event loop, each on its own connection of an
+# async engine, so the page waits for its slowest query instead of the sum.
+# Under a WSGI server the same queries run one after the other on the
+# request's session.
+
+class AsyncDatabase:
+
+  def __init__(self, url, options, replica_urls=None):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    self.engine = create_async_engine(url, **options)
+    # Async engines of the read replicas, keyed by the replica's engine in
+    # routing.ReplicaSet
+    self.replicas = {
+      replica: create_async_engine(replica_url, **options) for replica, replica_url in (replica_urls or {}).items()
+    }
+
+  def engine_for(self, replica):
+    '''The async engine of the replica a request reads from, or the primary's.'''
+    return self.engine if replica is None else self.replicas[replica]
+
+  async def fetch(self, engine, statement, stats):
+    async with engine.connect() as connection:
+      # The cursor events run on the event loop's thread, they find the
+      # request's statistics in the execution options rather than rely on
+      # asgiref copying the request context there
+      return (await connection.execute(statement, execution_options={'sql_stats': stats})).all()
+
+  async def gather(self, engine, statements, stats=None):
+    return await asyncio.gather(*[self.fetch(engine, statement, stats) for statement in statements])
+
+def fetch_all(*queries):
+  '''Returns the rows of each query, in order.
+
+  The queries read from the replica chosen for the request, if any, like the
+  request's session does (see routing.py).
+  '''
+  database = current_app.extensions.get('async_database')
+  if database is None:
+    return [query.all() for query in queries]
+
+  from asgiref.sync import async_to_sync
+  return async_to_sync(database.gather)(
+    database.engine_for(g.get('db_replica')),
+    [query.statement for query in queries],
+    g.get('sql_stats')
+  )
+
+def init_app(app):
+  '''Switches fetch_all() to the async engines of SQLALCHEMY_ASYNC_DATABASE_URI
+  and SQLALCHEMY_ASYNC_REPLICA_URIS, after routing.init_app().
+
+  Only for apps served by an ASGI server: the engine's connections belong to
+  the event loop that opened them, which must be the server's.
+  '''
+  replicas = app.extensions['replicas'].engines
+  replica_urls = app.config.get('SQLALCHEMY_ASYNC_REPLICA_URIS', [])
+  if len(replica_urls) != len(replicas):
+    raise ValueError('SQLALCHEMY_ASYNC_REPLICA_URIS needs one URL per SQLALCHEMY_REPLICA_URIS')
+
+  app.extensions['async_database'] = AsyncDatabase(
+    app.config['SQLALCHEMY_ASYNC_DATABASE_URI'],
+    app.config.get('SQLALCHEMY_ASYNC_ENGINE_OPTIONS', {}),
+    dict(zip(replicas, replica_urls))
+  )
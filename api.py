@@ -0,0 +1,128 @@
+import gzip
+from flask import Blueprint, abort, current_app, jsonify, request
+import aio
+from extensions import cache
+from models import Artist, Venue
+from queries import (
+  all_shows_page, artist_detail_queries, artist_shows_query, artists_page, search, shows_page, shows_page_rows,
+  upcoming_shows_counts, venue_detail_queries, venue_shows_query, venues_page
+)
+import serializers
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+def api_response(data, **extra):
+  '''JSON envelope of the API, trimmed to ?fields=name,... when given.'''
+  fields = set(filter(None, request.args.get('fields', '').split(',')))
+  return jsonify(data=serializers.select_fields(data, fields), **extra)
+
+def search_term():
+  '''The ?q= of the search endpoints, 400 when missing or blank.'''
+  term = request.args.get('q', '').strip()
+  if not term:
+    abort(400)
+  return term
+
+@bp.route('/venues')
+@cache.cached('venues')
+def api_venues():
+  page = venues_page(request.args.get('after'))
+  return api_response(
+    [serializers.venue_summary(row, row.num_upcoming_shows) for row in page.items],
+    next_cursor=page.next_cursor
+  )
+
+@bp.route('/venues/search')
+def api_search_venues():
+  page = search(Venue, search_term(), request.args.get('after'))
+  shows_counts = upcoming_shows_counts(Venue, [venue.id for venue in page.items])
+  return api_response(
+    [serializers.venue_summary(venue, shows_counts.get(venue.id, 0)) for venue in page.items],
+    next_cursor=page.next_cursor
+  )
+
+@bp.route('/venues/<int:venue_id>')
+@cache.cached('venue:{venue_id}')
+def api_venue(venue_id):
+  rows, upcoming_shows, past_shows = aio.fetch_all(*venue_detail_queries(venue_id))
+
+  if not rows:
+    abort(404)
+
+  return api_response(serializers.venue_detail(
+    rows[0],
+    shows_page_rows(upcoming_shows),
+    shows_page_rows(past_shows)
+  ))
+
+@bp.route('/venues/<int:venue_id>/shows/<any(upcoming, past):when>')
+@cache.cached('venue:{venue_id}')
+def api_venue_shows(venue_id, when):
+  page = shows_page(venue_shows_query(venue_id), when, request.args.get('after'))
+  return api_response([serializers.venue_show(show) for show in page.items], next_cursor=page.next_cursor)
+
+@bp.route('/artists')
+@cache.cached('artists')
+def api_artists():
+  page = artists_page(request.args.get('after'))
+  shows_counts = upcoming_shows_counts(Artist, [artist.id for artist in page.items])
+  return api_response(
+    [serializers.artist_summary(artist, shows_counts.get(artist.id, 0)) for artist in page.items],
+    next_cursor=page.next_cursor
+  )
+
+@bp.route('/artists/search')
+def api_search_artists():
+  page = search(Artist, search_term(), request.args.get('after'))
+  shows_counts = upcoming_shows_counts(Artist, [artist.id for artist in page.items])
+  return api_response(
+    [serializers.artist_summary(artist, shows_counts.get(artist.id, 0)) for artist in page.items],
+    next_cursor=page.next_cursor
+  )
+
+@bp.route('/artists/<int:artist_id>')
+@cache.cached('artist:{artist_id}')
+def api_artist(artist_id):
+  rows, upcoming_shows, past_shows = aio.fetch_all(*artist_detail_queries(artist_id))
+
+  if not rows:
+    abort(404)
+
+  return api_response(serializers.artist_detail(
+    rows[0],
+    shows_page_rows(upcoming_shows),
+    shows_page_rows(past_shows)
+  ))
+
+@bp.route('/artists/<int:artist_id>/shows/<any(upcoming, past):when>')
+@cache.cached('artist:{artist_id}')
+def api_artist_shows(artist_id, when):
+  page = shows_page(artist_shows_query(artist_id), when, request.args.get('after'))
+  return api_response([serializers.artist_show(show) for show in page.items], next_cursor=page.next_cursor)
+
+@bp.route('/shows')
+@cache.cached('shows')
+def api_shows():
+  page = all_shows_page(request.args.get('after'))
+  return api_response([serializers.show_summary(show) for show in page.items], next_cursor=page.next_cursor)
+
+@bp.after_app_request
+def compress_api_response(response):
+  '''Gzips API responses for clients that accept it.'''
+  if (
+    not request.path.startswith('/api/')
+    or response.status_code != 200
+    or response.direct_passthrough
+    or 'Content-Encoding' in response.headers
+    or 'gzip' not in request.accept_encodings
+  ):
+    return response
+
+  data = response.get_data()
+  if len(data) < current_app.config['API_GZIP_MIN_SIZE']:
+    return response
+
+  response.set_data(gzip.compress(data, compresslevel=6))
+  response.headers['Content-Encoding'] = 'gzip'
+  response.vary.add('Accept-Encoding')
+  return response
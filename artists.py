@@ -0,0 +1,239 @@
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, url_for
+import aio
+from browsing import render_browse
+from cache import conditional
+from enums import genre_names
+from extensions import cache, db
+from filters import format_datetime
+from invalidation import artist_validators, invalidate_artist, touch_artist_venues
+from models import Artist
+from queries import (
+  artist_detail_queries, artist_shows_query, artists_page, autocomplete, search, search_count, shows_page,
+  shows_page_rows, upcoming_shows_counts
+)
+from routing import read_only
+
+bp = Blueprint('artists', __name__)
+
+#  Artists
+#  ----------------------------------------------------------------
+
+@bp.route('/artists')
+@cache.cached('artists')
+def artists():
+  page = artists_page(request.args.get('after'))
+
+  data=[]
+
+  for artist in page.items:
+    data.append({
+      "id": artist.id,
+      "name": artist.name,
+    })
+
+  return render_template('pages/artists.html', artists=data, next_cursor=page.next_cursor)
+
+@bp.route('/artists/search', methods=['POST'])
+@read_only
+def search_artists():
+  search_term = request.form.get('search_term', '')
+
+  page = search(Artist, search_term, request.form.get('after'))
+  artists = page.items
+  shows_counts = upcoming_shows_counts(Artist, [artist.id for artist in artists])
+
+  data = []
+
+  for artist in artists:
+    data.append({
+      "id": artist.id,
+      "name": artist.name,
+      "num_upcoming_shows": shows_counts.get(artist.id, 0)
+    })
+
+  response={
+    "count": search_count(Artist, search_term),
+    "data": data
+  }
+  return render_template(
+    'pages/search_artists.html', results=response, search_term=search_term, next_cursor=page.next_cursor
+  )
+
+@bp.route('/artists/autocomplete')
+def autocomplete_artists():
+  '''Artists whose name starts with ?q=, for the show form.'''
+  prefix = request.args.get('q', '').strip()
+  results = autocomplete(Artist, prefix) if prefix else []
+  return jsonify(results=[{"id": id, "name": name} for id, name in results])
+
+@bp.route('/artists/<int:artist_id>')
+@conditional(artist_validators)
+@cache.cached('artist:{artist_id}')
+def show_artist(artist_id):
+  rows, upcoming_shows, past_shows = aio.fetch_all(*artist_detail_queries(artist_id))
+
+  if not rows:
+    abort(404)
+
+  artist = rows[0]
+  upcoming_shows = shows_page_rows(upcoming_shows)
+  past_shows = shows_page_rows(past_shows)
+
+  data = {
+    "id": artist.id,
+    "name": artist.name,
+    "genres": genre_names(artist.genres_mask),
+    "city": artist.city,
+    "state": artist.state,
+    "phone": artist.phone,
+    "website": artist.website,
+    "facebook_link": artist.facebook_link,
+    "seeking_venue": artist.seeking_venue,
+    "seeking_description": artist.seeking_description,
+    "image_link": artist.image_link,
+    "past_shows": [artist_show_data(show) for show in past_shows.items],
+    "upcoming_shows": [artist_show_data(show) for show in upcoming_shows.items],
+    "past_shows_count": artist.past_shows_count,
+    "upcoming_shows_count": artist.upcoming_shows_count,
+    "past_shows_cursor": past_shows.next_cursor,
+    "upcoming_shows_cursor": upcoming_shows.next_cursor
+  }
+
+  return render_template('pages/show_artist.html', artist=data)
+
+def artist_show_data(show):
+  return {
+    "venue_id": show.venue_id,
+    "venue_name": show.venue_name,
+    "venue_image_link": show.venue_image_link,
+    "start_time": show.start_time
+  }
+
+@bp.route('/artists/<int:artist_id>/shows/<any(upcoming, past):when>')
+@conditional(artist_validators)
+@cache.cached('artist:{artist_id}')
+def artist_shows(artist_id, when):
+  page = shows_page(artist_shows_query(artist_id), when, request.args.get('after'))
+
+  return jsonify(
+    shows=[{
+      "url": url_for('venues.show_venue', venue_id=show.venue_id),
+      "name": show.venue_name,
+      "image_link": show.venue_image_link,
+      "start_time": format_datetime(show.start_time, 'full')
+    } for show in page.items],
+    next_cursor=page.next_cursor
+  )
+
+@bp.route('/artists/browse')
+def browse_artists():
+  return render_browse(Artist, lambda id: url_for('artists.show_artist', artist_id=id), 'Artists', 'Seeking venues')
+
+#  Update
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+  artist = db.session.get(Artist, artist_id)
+
+  if not artist:
+    abort(404)
+
+  from forms import ArtistForm
+  form = ArtistForm()
+  artist={
+    "id": artist.id,
+    "name": artist.name,
+    "genres": [genre.value for genre in artist.genres],
+    "city": artist.city,
+    "state": artist.state,
+    "phone": artist.phone,
+    "website": artist.website,
+    "facebook_link": artist.facebook_link,
+    "seeking_venue": artist.seeking_venue,
+    "seeking_description": artist.seeking_description,
+    "image_link": artist.image_link
+  }
+  
+  return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+  try:
+    artist = db.session.get(Artist, artist_id)
+
+    if not artist:
+      abort(404)
+
+    artist.name = request.form.get("name")
+    artist.genres = request.form.getlist("genres")
+    artist.city = request.form.get("city")
+    artist.state = request.form.get("state")
+    artist.phone = request.form.get("phone")
+    artist.website = request.form.get("website")
+    artist.facebook_link = request.form.get("facebook_link")
+    seeking_venue = request.form.get("seeking_venue")
+    seeking_description = request.form.get("seeking_description")
+    artist.image_link = request.form.get("image_link")
+    touch_artist_venues(artist_id)
+
+    db.session.commit()
+    invalidate_artist(artist_id)
+
+    flash(f"Artist { artist.name } was updated")
+
+  except:
+    db.session.rollback()
+
+    flash(f'An error occurred. Artist {artist.name} could not be updated.')
+
+  return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+  from forms import ArtistForm
+  form = ArtistForm()
+  return render_template('forms/new_artist.html', form=form)
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+  try:
+    name = request.form.get('name')
+    city = request.form.get('city')
+    state = request.form.get('state')
+    phone = request.form.get('phone')
+    genres = request.form.getlist('genres')
+    image_link = request.form.get('image_link')
+    facebook_link = request.form.get('facebook_link')
+    website = request.form.get('website')
+    seeking_venue = request.form.get('seeking_venue')
+    seeking_description = request.form.get('seeking_description')
+
+    artist = Artist(
+      name=name, 
+      city=city, 
+      state=state, 
+      phone=phone, 
+      genres=genres,
+      image_link=image_link,
+      facebook_link=facebook_link,
+      website=website,
+      seeking_venue=seeking_venue,
+      seeking_description=seeking_description,
+    )
+
+    db.session.add(artist)
+    db.session.commit()
+    cache.invalidate('artists')
+
+    flash(f'Artist {name} was successfully listed!')
+
+  except:
+    db.session.rollback()
+
+    flash(f'An error occurred. Artist {name} could not be listed.')
+
+  return render_template('pages/home.html')
@@ -0,0 +1,29 @@
+import asyncio
+import contextvars
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+import aio
+
+# ASGI entry point, e.g. `uvicorn asgi:application --workers 4`. Views still
+# run in threads, but the venue and artist pages run their queries
+# concurrently on the server's event loop (see aio.py) instead of one after
+# the other.
+
+app = create_app()
+aio.init_app(app)
+wsgi = WsgiToAsgi(app)
+
+async def application(scope, receive, send):
+  # Each request runs from an empty context. The server starts a request in
+  # the context that resumed reading its connection, which can be the send()
+  # of the previous response, called from its WSGI thread by asgiref and
+  # carrying that finished call's executor: WsgiToAsgi would then hand the
+  # request to an executor that has quit.
+  await contextvars.Context().run(asyncio.ensure_future, handle(scope, receive, send))
+
+async def handle(scope, receive, send):
+  # WsgiToAsgi runs every request on one shared thread unless each request
+  # gets its own thread-sensitive context
+  async with ThreadSensitiveContext():
+    await wsgi(scope, receive, send)
@@ -0,0 +1,188 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import click
+from flask import Blueprint, current_app, request, send_from_directory, url_for
+
+# Static asset bundles. `flask assets build` concatenates and minifies the
+# CSS and JS the layouts use into static/dist, under names carrying a hash of
+# their content, and writes a manifest of those names plus gzip (and, when the
+# brotli package is installed, brotli) copies of each text file. Templates
+# link assets with static_url() and bundle_urls(), which use the manifest when
+# there is one and the app isn't in debug mode, the source files otherwise.
+# Files in static/dist never change under the same name, so they are served
+# with a one year immutable Cache-Control.
+
+bp = Blueprint('assets', __name__, cli_group='assets')
+
+# Bundle name -> source files under static/, in load order
+BUNDLES = {
+  'main.css': [
+    'css/bootstrap.min.css',
+    'css/layout.main.css',
+    'css/main.css',
+    'css/main.responsive.css',
+    'css/main.quickfix.css',
+  ],
+  'main.js': [
+    'js/libs/jquery-1.11.1.min.js',
+    'js/libs/bootstrap-3.1.1.min.js',
+    'js/plugins.js',
+    'js/script.js',
+  ],
+}
+# Other files linked with static_url(), fingerprinted but not bundled
+FILES = ['img/front-splash.jpg', 'js/libs/respond-1.4.2.min.js']
+
+DIST = 'dist'
+COMPRESSIBLE = ('.css', '.js', '.svg')
+ONE_YEAR = 365 * 24 * 3600
+
+CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+SOURCE_MAP = re.compile(r'^\s*//[#@] sourceMappingURL=.*$', re.MULTILINE)
+
+def minify_css(css):
+  '''Drops comments and the whitespace around CSS punctuation.'''
+  css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+  css = re.sub(r'\s+', ' ', css)
+  css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+  return css.replace(';}', '}').strip()
+
+def minify_js(js):
+  # JavaScript is only minified with rjsmin, if installed; the libraries are
+  # shipped minified already
+  try:
+    import rjsmin
+  except ImportError:
+    return js
+  return rjsmin.jsmin(js)
+
+def rebase_css_urls(css, source):
+  '''Rewrites relative url()s of a stylesheet under static/ for static/dist.'''
+  def rebase(match):
+    url = match.group(2)
+    if re.match(r'^(?:[a-z]+:|/|#)', url):
+      return match.group(0)
+    path, suffix = re.match(r'^([^?#]*)(.*)$', url).groups()
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+    return 'url("{}{}")'.format(posixpath.relpath(target, DIST), suffix)
+  return CSS_URL.sub(rebase, css)
+
+def bundle(sources, static_folder):
+  parts = []
+  for source in sources:
+    with open(os.path.join(static_folder, source), encoding='utf-8') as file:
+      text = file.read()
+    if source.endswith('.css'):
+      text = rebase_css_urls(text, source)
+      parts.append(text if '.min.' in source else minify_css(text))
+    else:
+      # Source maps of the minified libraries don't match the bundle
+      text = SOURCE_MAP.sub('', text)
+      # A statement ending a file without a semicolon must not run into the next
+      parts.append((text if '.min.' in source else minify_js(text)).rstrip() + ';')
+  return '\n'.join(parts).encode('utf-8')
+
+def fingerprinted(name, content):
+  stem, extension = os.path.splitext(name)
+  return '{}.{}{}'.format(stem, hashlib.sha256(content).hexdigest()[:12], extension)
+
+def write(dist_folder, name, content):
+  '''Writes a file of static/dist and its compressed copies, returns their sizes.'''
+  sizes = {'raw': len(content)}
+  with open(os.path.join(dist_folder, name), 'wb') as file:
+    file.write(content)
+  if not name.endswith(COMPRESSIBLE):
+    return sizes
+
+  compressed = {'.gz': gzip.compress(content, 9, mtime=0)}
+  try:
+    import brotli
+    compressed['.br'] = brotli.compress(content, quality=11)
+  except ImportError:
+    pass
+  for suffix, data in compressed.items():
+    with open(os.path.join(dist_folder, name + suffix), 'wb') as file:
+      file.write(data)
+    sizes[suffix] = len(data)
+  return sizes
+
+def build(static_folder):
+  '''Writes the bundles, fingerprinted files and the manifest to static/dist.
+
+  Returns {logical name: (file name, sizes)}.
+  '''
+  dist_folder = os.path.join(static_folder, DIST)
+  os.makedirs(dist_folder, exist_ok=True)
+
+  built = {}
+  for name, sources in BUNDLES.items():
+    content = bundle(sources, static_folder)
+    filename = fingerprinted(posixpath.basename(name), content)
+    built[name] = (filename, write(dist_folder, filename, content))
+  for name in FILES:
+    with open(os.path.join(static_folder, name), 'rb') as file:
+      content = file.read()
+    filename = fingerprinted(posixpath.basename(name), content)
+    built[name] = (filename, write(dist_folder, filename, content))
+
+  with open(os.path.join(dist_folder, 'manifest.json'), 'w') as file:
+    json.dump({name: filename for name, (filename, sizes) in built.items()}, file, indent=2, sort_keys=True)
+    file.write('\n')
+  return built
+
+def load_manifest(app):
+  path = os.path.join(app.static_folder, DIST, 'manifest.json')
+  if app.debug or not os.path.exists(path):
+    return {}
+  with open(path) as file:
+    return json.load(file)
+
+def static_url(filename):
+  '''URL of a file under static/, its fingerprinted copy once built.'''
+  manifest = current_app.extensions['assets_manifest']
+  if filename in manifest:
+    return url_for('assets.dist', filename=manifest[filename])
+  return url_for('static', filename=filename)
+
+def bundle_urls(name):
+  '''URLs to link for a bundle: the bundle once built, its sources until then.'''
+  manifest = current_app.extensions['assets_manifest']
+  if name in manifest:
+    return [url_for('assets.dist', filename=manifest[name])]
+  return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+@bp.route('/static/dist/<path:filename>')
+def dist(filename):
+  '''Serves built files, precompressed when the client accepts it.'''
+  folder = os.path.join(current_app.static_folder, DIST)
+  served, encoding = filename, None
+  for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+    if request.accept_encodings[candidate] and os.path.isfile(os.path.join(folder, filename + suffix)):
+      served, encoding = filename + suffix, candidate
+      break
+
+  response = send_from_directory(folder, served, mimetype=mimetypes.guess_type(filename)[0], max_age=ONE_YEAR)
+  if encoding:
+    response.headers['Content-Encoding'] = encoding
+  response.vary.add('Accept-Encoding')
+  response.cache_control.public = True
+  response.cache_control.immutable = True
+  return response
+
+@bp.cli.command('build')
+def build_command():
+  '''Bundles, fingerprints and compresses the static assets.'''
+  for name, (filename, sizes) in build(current_app.static_folder).items():
+    details = ', '.join(f'{suffix} {size} B' for suffix, size in sizes.items())
+    click.echo(f'{name} -> {DIST}/{filename} ({details})')
+
+def init_app(app):
+  app.extensions['assets_manifest'] = load_manifest(app)
+  app.add_template_global(static_url)
+  app.add_template_global(bundle_urls)
+  app.register_blueprint(bp)
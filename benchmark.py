@@ -0,0 +1,225 @@
+import http.client
+import json
+import random
+import re
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+import click
+from flask import Blueprint, current_app
+from enums import GenresEnum, StateEnum
+from extensions import cache, db
+from models import Artist, Venue
+
+# Benchmarks of the main controllers, run in process through the test client
+# against the configured database (seed it first with `flask seed`), and a
+# load test of a running server over many concurrent connections. Results
+# are written as JSON, tagged with the current commit, so runs can be compared
+# across commits.
+
+bp = Blueprint('benchmark', __name__, cli_group=None)
+
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+def id_range(model):
+  return db.session.query(db.func.min(model.id), db.func.max(model.id)).one()
+
+def scenarios(rng):
+  '''Name and request factory of each benchmarked controller.'''
+  venue_ids = id_range(Venue)
+  artist_ids = id_range(Artist)
+  if None in venue_ids or None in artist_ids:
+    raise click.ClickException('No venues or artists to benchmark, run `flask seed` first.')
+  names = [name for name, in db.session.query(Artist.name).limit(200)]
+
+  def profile_form():
+    return {
+      'name': f'Benchmark {rng.randrange(10 ** 9)}',
+      'city': 'Benchmark City',
+      'state': str(rng.choice(list(StateEnum)).value),
+      'address': '1 Main St',
+      'phone': '123456789',
+      'genres': [str(rng.choice(list(GenresEnum)).value)],
+      'image_link': 'https://images.example.com/benchmark.jpg',
+      'facebook_link': 'https://www.facebook.com/benchmark',
+      'website': 'https://benchmark.example.com',
+    }
+
+  return {
+    'venues': lambda: ('GET', '/venues', None),
+    'show_venue': lambda: ('GET', f'/venues/{rng.randint(*venue_ids)}', None),
+    'show_artist': lambda: ('GET', f'/artists/{rng.randint(*artist_ids)}', None),
+    'search_artists': lambda: ('POST', '/artists/search', {'search_term': rng.choice(names).split()[1]}),
+    'shows': lambda: ('GET', '/shows', None),
+    'create_venue': lambda: ('POST', '/venues/create', profile_form()),
+    'create_artist': lambda: ('POST', '/artists/create', profile_form()),
+    'create_show': lambda: ('POST', '/shows/create', {
+      'venue_id': str(rng.randint(*venue_ids)),
+      'artist_id': str(rng.randint(*artist_ids)),
+      'start_time': (datetime.today() + timedelta(days=rng.randint(1, 365))).strftime('%Y-%m-%d %H:%M:%S'),
+    }),
+  }
+
+def percentile(values, share):
+  values = sorted(values)
+  return values[min(len(values) - 1, int(round(share * (len(values) - 1))))]
+
+def run(client, make_request, iterations):
+  durations = []
+  db_durations = []
+  queries = []
+  for _ in range(iterations):
+    method, path, data = make_request()
+    start = time.perf_counter()
+    response = client.open(path, method=method, data=data)
+    durations.append((time.perf_counter() - start) * 1000)
+    if response.status_code >= 400:
+      raise click.ClickException(f'{method} {path} answered {response.status_code}')
+    timing = SERVER_TIMING.search(response.headers.get('Server-Timing', ''))
+    if timing:
+      db_durations.append(float(timing.group(1)))
+      queries.append(int(timing.group(2)))
+
+  return {
+    "iterations": iterations,
+    "mean_ms": round(statistics.mean(durations), 3),
+    "p50_ms": round(percentile(durations, 0.5), 3),
+    "p95_ms": round(percentile(durations, 0.95), 3),
+    "p99_ms": round(percentile(durations, 0.99), 3),
+    "db_mean_ms": round(statistics.mean(db_durations), 3) if db_durations else None,
+    "queries_mean": round(statistics.mean(queries), 2) if queries else None,
+  }
+
+def load(url, make_requests, connections, duration):
+  '''Sends requests to a server over `connections` keep-alive connections,
+  each one after the other, for `duration` seconds.'''
+  target = urlsplit(url)
+  durations = []
+  errors = []
+  lock = threading.Lock()
+  deadline = time.perf_counter() + duration
+
+  def connection_loop():
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+    timings, failed = [], 0
+    while time.perf_counter() < deadline:
+      method, path, data = random.choice(make_requests)()
+      body = urlencode(data, doseq=True) if data else None
+      headers = {'Content-Type': 'application/x-www-form-urlencoded'} if data else {}
+      start = time.perf_counter()
+      try:
+        connection.request(method, target.path.rstrip('/') + path, body, headers)
+        response = connection.getresponse()
+        response.read()
+      except (OSError, http.client.HTTPException):
+        connection.close()
+        failed += 1
+        continue
+      timings.append((time.perf_counter() - start) * 1000)
+      failed += response.status >= 400
+    connection.close()
+    with lock:
+      durations.extend(timings)
+      errors.append(failed)
+
+  threads = [threading.Thread(target=connection_loop) for _ in range(connections)]
+  started = time.perf_counter()
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  elapsed = time.perf_counter() - started
+
+  return {
+    "connections": connections,
+    "seconds": round(elapsed, 1),
+    "requests": len(durations),
+    "errors": sum(errors),
+    "requests_per_second": round(len(durations) / elapsed, 1),
+    "p50_ms": round(percentile(durations, 0.5), 3) if durations else None,
+    "p99_ms": round(percentile(durations, 0.99), 3) if durations else None,
+  }
+
+def current_commit():
+  try:
+    return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+@bp.cli.command('bench')
+@click.option('--iterations', default=200, show_default=True, help='Requests per controller.')
+@click.option('--only', multiple=True, help='Controllers to run, all by default.')
+@click.option('--cached', is_flag=True, help='Let GET requests hit the response cache.')
+@click.option('--output', type=click.File('w'), default='benchmark.json', show_default=True)
+@click.option('--seed', 'seed', default=0, show_default=True)
+def bench_command(iterations, only, cached, output, seed):
+  '''Times the main controllers and writes the results as JSON.
+
+  The create controllers insert rows, run this on a benchmark database.
+  '''
+  rng = random.Random(seed)
+  if not cached:
+    # Every cache entry expires as soon as it is stored
+    cache.timeout = 0
+  current_app.config['WTF_CSRF_ENABLED'] = False
+  client = current_app.test_client()
+
+  results = {}
+  for name, make_request in scenarios(rng).items():
+    if only and name not in only:
+      continue
+    # Warm up connections, caches of compiled statements and templates
+    run(client, make_request, min(10, iterations))
+    results[name] = run(client, make_request, iterations)
+    click.echo(f"{name}: p50 {results[name]['p50_ms']} ms, p99 {results[name]['p99_ms']} ms")
+
+  json.dump({
+    "commit": current_commit(),
+    "created_at": datetime.utcnow().isoformat(),
+    "database": db.engine.dialect.name,
+    "venues": db.session.query(db.func.count(Venue.id)).scalar(),
+    "artists": db.session.query(db.func.count(Artist.id)).scalar(),
+    "cached": cached,
+    "results": results,
+  }, output, indent=2)
+  output.write('\n')
+
+@bp.cli.command('loadtest')
+@click.argument('url')
+@click.option('--connections', default=200, show_default=True, help='Concurrent keep-alive connections.')
+@click.option('--duration', default=30, show_default=True, help='Seconds to run.')
+@click.option('--only', multiple=True, default=['show_venue', 'show_artist'], show_default=True,
+  help='Controllers to request, picked at random for each request.')
+@click.option('--label', help='Recorded with the results, e.g. the server and its settings.')
+@click.option('--output', type=click.File('w'), default='loadtest.json', show_default=True)
+@click.option('--seed', 'seed', default=0, show_default=True)
+def loadtest_command(url, connections, duration, only, label, output, seed):
+  '''Loads the server at URL and writes requests per second as JSON.
+
+  The server must serve the configured database, which gives the ids to
+  request. Run it once against each server to compare them, e.g. WSGI and
+  ASGI (asgi.py) with the same number of workers.
+  '''
+  all_scenarios = scenarios(random.Random(seed))
+  unknown = set(only) - set(all_scenarios)
+  if unknown:
+    raise click.ClickException(f"Unknown controllers: {', '.join(sorted(unknown))}")
+  result = load(url, [all_scenarios[name] for name in only], connections, duration)
+  click.echo(
+    f"{result['requests_per_second']} requests/s, p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+    f"{result['errors']} errors"
+  )
+
+  json.dump({
+    "commit": current_commit(),
+    "created_at": datetime.utcnow().isoformat(),
+    "url": url,
+    "label": label,
+    "database": db.engine.dialect.name,
+    "controllers": list(only),
+    "result": result,
+  }, output, indent=2)
+  output.write('\n')
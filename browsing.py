@@ -0,0 +1,64 @@
+from flask import abort, jsonify, render_template, request, url_for
+from enums import GENRE_NAMES, GenresEnum, StateEnum, state_name
+from queries import browse
+
+# Browse pages of venues and artists, shared by both blueprints.
+
+def browse_filters():
+  '''Reads ?state=NY&city=...&genre=Jazz,Blues&seeking=true, 400 on unknown values.'''
+  filters = {}
+  try:
+    if request.args.get('state'):
+      filters['state'] = StateEnum[request.args['state']]
+    if request.args.get('city'):
+      filters['city'] = request.args['city']
+    if request.args.get('genre'):
+      filters['genre'] = [GenresEnum[name] for name in request.args['genre'].split(',')]
+    if request.args.get('seeking'):
+      filters['seeking'] = {'true': True, 'false': False}[request.args['seeking']]
+  except KeyError:
+    abort(400)
+  return filters
+
+def render_browse(model, detail_url, title, seeking_label):
+  page, facets = browse(model, browse_filters(), request.args.get('after'))
+  args = {name: value for name, value in request.args.items() if name != 'after'}
+
+  results = [{
+    "id": row.id,
+    "name": row.name,
+    "city": row.city,
+    "state": state_name(row.state),
+    "url": detail_url(row.id)
+  } for row in page.items]
+
+  labels = {
+    'state': state_name,
+    'city': lambda value: value,
+    'genre': lambda value: GENRE_NAMES[int(value)],
+    'seeking': lambda value: value,
+  }
+  facet_data = {}
+  for facet, values in facets.items():
+    facet_data[facet] = []
+    for value, count in sorted(values, key=lambda item: -item[1]):
+      param = labels[facet](value)
+      facet_data[facet].append({
+        "value": param,
+        "count": count,
+        "active": args.get(facet) == param,
+        "url": url_for(request.endpoint, **dict(args, **{facet: param}))
+      })
+
+  if request.accept_mimetypes.best == 'application/json':
+    return jsonify(results=results, facets=facet_data, next_cursor=page.next_cursor)
+
+  return render_template(
+    'pages/browse.html',
+    title=title,
+    seeking_label=seeking_label,
+    results=results,
+    facets=facet_data,
+    filtered=bool(args),
+    next_url=url_for(request.endpoint, after=page.next_cursor, **args) if page.next_cursor else None
+  )
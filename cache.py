@@ -0,0 +1,183 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from functools import wraps
+from flask import Response, make_response, request, session
+
+class LRUBackend:
+  '''Bounded in-process cache, least recently used entries are evicted first.
+
+  Generations live outside the LRU so that evicting one can never bring a
+  stale entry back to life.
+  '''
+
+  def __init__(self, max_entries=1024):
+    self.max_entries = max_entries
+    self._entries = OrderedDict()
+    self._generations = {}
+    self._lock = threading.Lock()
+
+  def get(self, key):
+    with self._lock:
+      item = self._entries.get(key)
+      if item is None:
+        return None
+      expires_at, value = item
+      if expires_at < time.monotonic():
+        del self._entries[key]
+        return None
+      self._entries.move_to_end(key)
+      return value
+
+  def set(self, key, value, timeout):
+    with self._lock:
+      self._entries[key] = (time.monotonic() + timeout, value)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def generations(self, namespaces):
+    with self._lock:
+      return [self._generations.get(namespace, 0) for namespace in namespaces]
+
+  def bump(self, namespace):
+    with self._lock:
+      self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+class RedisBackend:
+  '''Cache shared by all workers, in any server speaking the Redis protocol.'''
+
+  def __init__(self, url):
+    import redis
+    self.client = redis.Redis.from_url(url)
+
+  def get(self, key):
+    value = self.client.get(key)
+    return pickle.loads(value) if value is not None else None
+
+  def set(self, key, value, timeout):
+    self.client.set(key, pickle.dumps(value), ex=int(timeout))
+
+  def generations(self, namespaces):
+    return [int(value or 0) for value in self.client.mget([f'gen:{namespace}' for namespace in namespaces])]
+
+  def bump(self, namespace):
+    self.client.incr(f'gen:{namespace}')
+
+class ResponseCache:
+  '''Caches rendered GET responses per route and arguments.
+
+  Every cached view declares the namespaces its output depends on, e.g.
+  'venue:{venue_id}' and 'venues'. Each namespace has a generation number
+  that is part of the cache key, so invalidating a namespace (bumping its
+  generation) orphans exactly the entries built from it. Orphaned entries
+  age out of the backend on their own.
+  '''
+
+  def __init__(self, app=None):
+    self.backend = None
+    self.timeout = 300
+    self.hits = 0
+    self.misses = 0
+    self._lock = threading.Lock()
+    if app is not None:
+      self.init_app(app)
+
+  def init_app(self, app):
+    if app.config.get('CACHE_BACKEND', 'lru') == 'redis':
+      self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+    else:
+      self.backend = LRUBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+    self.timeout = app.config.get('CACHE_TIMEOUT', 300)
+
+  def cached(self, *namespaces):
+    def decorator(view):
+      @wraps(view)
+      def wrapper(**kwargs):
+        # Pages carrying flashed messages are one-off, never serve or store them
+        if request.method != 'GET' or '_flashes' in session:
+          return view(**kwargs)
+
+        resolved = [namespace.format(**kwargs) for namespace in namespaces]
+        generations = self.backend.generations(resolved)
+        key = 'view:{}?{}:{}'.format(
+          request.path,
+          '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True))),
+          ','.join(map(str, generations))
+        )
+
+        entry = self.backend.get(key)
+        if entry is not None:
+          self._count(hit=True)
+          body, mimetype = entry
+          response = Response(body, mimetype=mimetype)
+          response.headers['X-Cache'] = 'HIT'
+          return response
+
+        self._count(hit=False)
+        response = make_response(view(**kwargs))
+        if response.status_code == 200 and '_flashes' not in session:
+          self.backend.set(key, (response.get_data(), response.mimetype), self.timeout)
+        response.headers['X-Cache'] = 'MISS'
+        return response
+      return wrapper
+    return decorator
+
+  def invalidate(self, *namespaces):
+    for namespace in namespaces:
+      self.backend.bump(namespace)
+
+  def stats(self):
+    with self._lock:
+      return {"hits": self.hits, "misses": self.misses}
+
+  def _count(self, hit):
+    with self._lock:
+      if hit:
+        self.hits += 1
+      else:
+        self.misses += 1
+
+def conditional(validator):
+  '''Answers If-None-Match / If-Modified-Since with 304 before the view runs.
+
+  `validator(**view_args)` returns `(parts, last_modified)` from cheap queries,
+  or None when the resource doesn't exist and the view should answer. The
+  strong ETag is a digest of `parts`, `last_modified` and the request path and
+  query string; `last_modified` is an aware UTC datetime.
+  '''
+  def decorator(view):
+    @wraps(view)
+    def wrapper(**kwargs):
+      if request.method != 'GET' or '_flashes' in session:
+        return view(**kwargs)
+
+      validators = validator(**kwargs)
+      if validators is None:
+        return view(**kwargs)
+
+      parts, last_modified = validators
+      etag = hashlib.sha1(repr((request.full_path, parts, last_modified)).encode()).hexdigest()
+      # HTTP dates have whole seconds
+      last_modified = last_modified.replace(microsecond=0)
+
+      if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+      elif request.if_modified_since:
+        since = request.if_modified_since
+        if since.tzinfo is None:
+          since = since.replace(tzinfo=timezone.utc)
+        not_modified = last_modified <= since
+      else:
+        not_modified = False
+
+      response = Response(status=304) if not_modified else make_response(view(**kwargs))
+      response.set_etag(etag)
+      response.last_modified = last_modified
+      response.cache_control.no_cache = True
+      return response
+    return wrapper
+  return decorator
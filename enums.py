@@ -1,14 +1,21 @@
 from enum import Enum, auto
+from types import MappingProxyType
 
 class EnumBase(Enum):
 
   @classmethod
   def choices(cls):
-    return [(choice, choice.name) for choice in cls]
+    return CHOICES[cls]
 
   @classmethod
   def coerce(cls, item):
-    return cls(int(item)) if not isinstance(item, cls) else item
+    if isinstance(item, cls):
+      return item
+    try:
+      return MEMBERS[cls][item]
+    except (KeyError, TypeError):
+      # WTForms reports ValueError as an invalid choice
+      raise ValueError(f'{item!r} is not a valid {cls.__name__}')
 
   def __str__(self):
     return str(self.value)
@@ -86,3 +93,75 @@ class StateEnum(EnumBase):
   WV = auto()
   WI = auto()
   WY = auto()   
+
+# Lookup tables, built once at import. Calling an enum class to look up a
+# member costs a microsecond or more, these are plain dict lookups.
+
+def lookup_tables(enum):
+  '''id -> name and name -> id tables of an enum.'''
+  return (
+    MappingProxyType({member.value: member.name for member in enum}),
+    MappingProxyType({member.name: member.value for member in enum})
+  )
+
+GENRE_NAMES, GENRE_IDS = lookup_tables(GenresEnum)
+STATE_NAMES, STATE_IDS = lookup_tables(StateEnum)
+
+CHOICES = MappingProxyType({
+  enum: tuple((member, member.name) for member in enum) for enum in (GenresEnum, StateEnum)
+})
+# Members by value, as an int or as the string forms submit and columns store
+MEMBERS = MappingProxyType({
+  enum: MappingProxyType({
+    **{member.value: member for member in enum},
+    **{str(member.value): member for member in enum}
+  }) for enum in (GenresEnum, StateEnum)
+})
+
+def state_name(value):
+  '''Name of a state stored as its id, e.g. '27' -> 'NY'. None for rows
+  without a state (NULL, or '' in venues from before it was required).'''
+  return STATE_NAMES[int(value)] if value else None
+
+# A set of genres is stored as one integer with bit (id - 1) set for each.
+# Masks are decoded a byte at a time, with a table of the genres of each of
+# the 256 values of every byte.
+
+GENRE_BITS = MappingProxyType({
+  key: 1 << (member.value - 1) for member in GenresEnum for key in (member, member.value, str(member.value))
+})
+
+def byte_tables(values):
+  '''For each byte of a mask over `values`, the values set in each byte value.'''
+  return tuple(
+    tuple(
+      tuple(value for bit, value in enumerate(values[offset:offset + 8]) if byte & (1 << bit))
+      for byte in range(256)
+    ) for offset in range(0, len(values), 8)
+  )
+
+# GenresEnum ids run from 1 without gaps, bit i is id i + 1
+GENRE_NAME_BYTES = byte_tables([member.name for member in GenresEnum])
+GENRE_ID_BYTES = byte_tables([member.value for member in GenresEnum])
+
+def genres_mask(genres):
+  '''Encodes GenresEnum members or ids as a bitmask.'''
+  mask = 0
+  for genre in genres:
+    mask |= GENRE_BITS[genre]
+  return mask
+
+def decode(mask, tables):
+  values = []
+  for table in tables:
+    values.extend(table[mask & 0xFF])
+    mask >>= 8
+  return values
+
+def genre_names(mask):
+  '''Decodes a bitmask into genre names, in GenresEnum order.'''
+  return decode(mask, GENRE_NAME_BYTES)
+
+def genre_ids(mask):
+  '''Decodes a bitmask into genre ids, in GenresEnum order.'''
+  return decode(mask, GENRE_ID_BYTES)
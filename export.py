@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+import click
+from flask import Blueprint, Response, current_app, stream_with_context
+from enums import genre_ids
+from queries import export_query
+
+bp = Blueprint('export', __name__, cli_group=None)
+
+FORMATS = {
+  'csv': 'text/csv',
+  'ndjson': 'application/x-ndjson',
+}
+
+# Columns exported decoded, as lists: genre ids like the import takes them,
+# ';'-separated in CSV
+DECODERS = {
+  'genres': genre_ids,
+}
+
+def stream_rows(query, format, chunk_size=1000):
+  '''Yields `query` encoded as CSV (with a header) or NDJSON, chunk by chunk.
+
+  Rows are fetched `chunk_size` at a time from a server-side cursor and each
+  chunk is encoded and yielded before the next one is fetched, so memory use
+  doesn't depend on the number of rows.
+  '''
+  columns = [description['name'] for description in query.column_descriptions]
+  decoders = [(index, DECODERS[name]) for index, name in enumerate(columns) if name in DECODERS]
+  rows = query.execution_options(stream_results=True).yield_per(chunk_size)
+
+  buffer = io.StringIO()
+  writer = csv.writer(buffer)
+  if format == 'csv':
+    writer.writerow(columns)
+
+  for number, row in enumerate(rows, 1):
+    if decoders:
+      row = list(row)
+      for index, decode in decoders:
+        values = list(decode(row[index]))
+        row[index] = ';'.join(map(str, values)) if format == 'csv' else values
+    if format == 'csv':
+      writer.writerow(row)
+    else:
+      buffer.write(json.dumps(dict(zip(columns, row)), default=str))
+      buffer.write('\n')
+
+    if number % chunk_size == 0:
+      yield buffer.getvalue()
+      buffer.seek(0)
+      buffer.truncate()
+
+  yield buffer.getvalue()
+
+@bp.route('/export/<any(shows, venues, artists):kind>.<any(csv, ndjson):format>')
+def export_data(kind, format):
+  chunks = stream_rows(export_query(kind), format, current_app.config['EXPORT_CHUNK_SIZE'])
+  response = Response(stream_with_context(chunks), mimetype=FORMATS[format])
+  response.headers['Content-Disposition'] = f'attachment; filename={kind}.{format}'
+  return response
+
+@bp.cli.command('export')
+@click.argument('kind', type=click.Choice(['shows', 'venues', 'artists']))
+@click.option('--format', 'format', type=click.Choice(list(FORMATS)), default='csv')
+@click.option('--output', type=click.File('w'), default='-', help='File to write, standard output by default.')
+def export_command(kind, format, output):
+  '''Streams every show, venue or artist as CSV or NDJSON.'''
+  for chunk in stream_rows(export_query(kind), format, current_app.config['EXPORT_CHUNK_SIZE']):
+    output.write(chunk)
@@ -0,0 +1,11 @@
+from flask_moment import Moment
+from flask_sqlalchemy import SQLAlchemy
+from cache import ResponseCache
+from routing import RoutingSession
+
+# Extensions are created unbound and attached to an app by create_app(), so
+# importing a module that needs `db` or `cache` never builds an application.
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+moment = Moment()
+cache = ResponseCache()
@@ -0,0 +1,31 @@
+from functools import lru_cache
+
+# babel and dateutil are imported on first use: they are among the slowest
+# imports of the app and most processes (CLI commands, workers serving only
+# the API) never format a date.
+
+DATETIME_FORMATS = {
+  'full': "EEEE MMMM, d, y 'at' h:mma",
+  'medium': "EE MM, dd, y h:mma",
+}
+
+@lru_cache(maxsize=None)
+def datetime_pattern(format):
+  import babel.dates
+  return babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format))
+
+@lru_cache(maxsize=None)
+def babel_locale(locale):
+  import babel
+  import babel.dates
+  return babel.Locale.parse(locale or babel.dates.LC_TIME)
+
+# Listings repeat the same start times on every render, so formatted values
+# are memoized; the bound keeps the cache from growing with the Show table.
+@lru_cache(maxsize=4096)
+def format_datetime(value, format='medium', locale=None):
+  if isinstance(value, str):
+    import dateutil.parser
+    value = dateutil.parser.parse(value)
+  # The patterns have no time zone fields, so naive datetimes are formatted as is
+  return datetime_pattern(format).apply(value, babel_locale(locale))
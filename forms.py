@@ -1,9 +1,47 @@
 from datetime import datetime
 from flask_wtf import Form
+from markupsafe import Markup
 from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
-from wtforms.validators import DataRequired, AnyOf, URL, Length
+from wtforms.validators import DataRequired, InputRequired, AnyOf, URL, Length, Optional
+from wtforms.widgets import Select, html_params
 from enums import StateEnum, GenresEnum
 
+class PrerenderedSelect(Select):
+    '''Select widget of a fixed choice list, rendering its options from HTML
+    built once and shared by every form and request.
+
+    The selection is the field's data, or the `value` given when rendering it
+    (the edit pages pass the stored values).
+    '''
+
+    def __init__(self, choices, multiple=False):
+        super().__init__(multiple)
+        self.choices = choices
+        self._options = None
+
+    def options(self):
+        if self._options is None:
+            self._options = [
+                (str(value), self.render_option(value, label, False), self.render_option(value, label, True))
+                for value, label in self.choices
+            ]
+        return self._options
+
+    def __call__(self, field, value=None, **kwargs):
+        kwargs.setdefault('id', field.id)
+        if self.multiple:
+            kwargs['multiple'] = True
+        if 'required' not in kwargs and 'required' in getattr(field, 'flags', []):
+            kwargs['required'] = True
+        if value is None:
+            value = field.data
+        selected = {str(item) for item in value or ()} if self.multiple else {str(value)}
+
+        html = ['<select %s>' % html_params(name=field.name, **kwargs)]
+        html.extend(selected_option if key in selected else option for key, option, selected_option in self.options())
+        html.append('</select>')
+        return Markup(''.join(html))
+
 class ShowForm(Form):
     artist_id = StringField(
         'artist_id'
@@ -11,10 +49,12 @@ class ShowForm(Form):
     venue_id = StringField(
         'venue_id'
     )
+    # The default only fills in the create page, a submitted or imported show
+    # must carry its own start time
     start_time = DateTimeField(
         'start_time',
-        validators=[DataRequired()],
-        default= datetime.today()
+        validators=[InputRequired()],
+        default= datetime.today
     )
 
 class VenueForm(Form):
@@ -30,7 +70,8 @@ class VenueForm(Form):
         'state',
         validators=[DataRequired()],
         choices = StateEnum.choices(),
-        coerce = StateEnum.coerce
+        coerce = StateEnum.coerce,
+        widget = PrerenderedSelect(StateEnum.choices())
     )
     address = StringField(
         'address', 
@@ -38,37 +79,39 @@ class VenueForm(Form):
     )
     phone = StringField(
         'phone', 
-        validators=[Length(min=9, max=9)]
+        validators=[Optional(), Length(min=9, max=9)]
     )
     image_link = StringField(
         'image_link',
-        validators=[URL()]
+        validators=[Optional(), URL()]
     )
     genres = SelectMultipleField(
         'genres', 
         validators=[DataRequired()],
         choices = GenresEnum.choices(),
-        coerce = GenresEnum.coerce
+        coerce = GenresEnum.coerce,
+        widget = PrerenderedSelect(GenresEnum.choices(), multiple=True)
     )
     facebook_link = StringField(
         'facebook_link', 
-        validators=[URL()]
+        validators=[Optional(), URL()]
     )
     image_link = StringField(
         'image_link', 
-        validators=[URL()]
+        validators=[Optional(), URL()]
     )
     website = StringField(
         'website', 
-        validators=[URL()]
+        validators=[Optional(), URL()]
     )
     seeking_talent = BooleanField(
         'seeking_talent',
         false_values={False, 'false', ''}
     )
+    # Free text, not a link
     seeking_description = StringField(
         'seeking_description', 
-        validators=[URL()]
+        validators=[Optional(), Length(max=300)]
     )
 
 class ArtistForm(Form):
@@ -84,11 +127,12 @@ class ArtistForm(Form):
         'state',
         validators=[DataRequired()],
         choices = StateEnum.choices(),
-        coerce = StateEnum.coerce
+        coerce = StateEnum.coerce,
+        widget = PrerenderedSelect(StateEnum.choices())
     )
     phone = StringField(
         'phone', 
-        validators=[Length(min=9, max=9)]
+        validators=[Optional(), Length(min=9, max=9)]
     )
     image_link = StringField(
         'image_link'
@@ -97,15 +141,16 @@ class ArtistForm(Form):
         'genres', 
         validators=[DataRequired()],
         choices = GenresEnum.choices(),
-        coerce = GenresEnum.coerce
+        coerce = GenresEnum.coerce,
+        widget = PrerenderedSelect(GenresEnum.choices(), multiple=True)
     )
     facebook_link = StringField(
         'facebook_link', 
-        validators=[URL()]
+        validators=[Optional(), URL()]
     )
     website = StringField(
         'website', 
-        validators=[URL()]
+        validators=[Optional(), URL()]
     )
     seeking_venue = BooleanField(
         'seeking_venue',
@@ -113,5 +158,5 @@ class ArtistForm(Form):
     )
     seeking_description = StringField(
         'seeking_description', 
-        validators=[URL()]
+        validators=[Optional(), Length(max=300)]
     )
\ No newline at end of file
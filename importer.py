@@ -0,0 +1,241 @@
+import csv
+import io
+import json
+import os
+import click
+from datetime import datetime
+from itertools import islice
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.datastructures import MultiDict
+from enums import genre_ids, genres_mask
+from extensions import cache, db
+from models import Artist, ArtistGenre, Show, Venue, VenueGenre
+import stats
+
+bp = Blueprint('importer', __name__, cli_group=None)
+
+class MalformedRecord:
+  '''Stands in for an NDJSON line that isn't a JSON object, so that it is
+  reported as a row error instead of failing the import.'''
+  def __init__(self, message):
+    self.errors = {"record": [message]}
+
+def read_records(stream, format):
+  '''Yields dicts from a CSV (with a header row) or NDJSON text stream.'''
+  if format == 'csv':
+    yield from csv.DictReader(stream)
+  else:
+    for line in stream:
+      if not line.strip():
+        continue
+      try:
+        record = json.loads(line)
+      except json.JSONDecodeError as error:
+        yield MalformedRecord(f'Not valid JSON: {error}.')
+        continue
+      yield record if isinstance(record, dict) else MalformedRecord('Not a JSON object.')
+
+def batches(records, size, start=0):
+  '''Splits records into lists of `size`, numbering records from 1 and
+  skipping the first `start` of them.'''
+  numbered = islice(enumerate(records, 1), start, None)
+  while True:
+    batch = list(islice(numbered, size))
+    if not batch:
+      return
+    yield batch
+
+def validate(form, record):
+  '''Runs a record through a form of the matching create page.
+
+  Returns the coerced form data and None, or None and the form errors.
+  Multi-valued fields (genres) may be lists or ';'-separated strings. The
+  form is reprocessed for each record, binding its fields once per batch
+  rather than once per record.
+  '''
+  formdata = MultiDict()
+  for name, value in record.items():
+    if value is None or value == '':
+      continue
+    if isinstance(value, list):
+      formdata.setlist(name, [str(item) for item in value])
+    elif name == 'genres':
+      formdata.setlist(name, [item for item in str(value).split(';') if item])
+    elif isinstance(value, bool):
+      formdata[name] = 'y' if value else ''
+    else:
+      formdata[name] = str(value)
+
+  form.process(formdata)
+  if not form.validate():
+    return None, form.errors
+  return form.data, None
+
+class Checkpoint:
+  '''Remembers in a file how many records of an import have been committed.'''
+
+  def __init__(self, path):
+    self.path = path
+
+  def load(self):
+    if not self.path or not os.path.exists(self.path):
+      return 0
+    with open(self.path) as checkpoint:
+      return int(checkpoint.read().strip() or 0)
+
+  def save(self, position):
+    if not self.path:
+      return
+    # Write then rename so a crash never leaves a truncated checkpoint
+    with open(self.path + '.tmp', 'w') as checkpoint:
+      checkpoint.write(str(position))
+    os.replace(self.path + '.tmp', self.path)
+
+# Form class names, imported from forms on first use like in the views
+IMPORT_FORMS = {
+  'venues': 'VenueForm',
+  'artists': 'ArtistForm',
+  'shows': 'ShowForm',
+}
+
+def insert_profiles(model, genre_model, genre_key, rows):
+  '''Inserts validated venue or artist form data and their genres.
+
+  The batch goes in as multi-row INSERT ... RETURNING id statements (SQLAlchemy's
+  insertmanyvalues, on PostgreSQL and SQLite alike), the genres as one
+  executemany.
+  '''
+  now = datetime.utcnow()
+  columns = [column.key for column in model.__table__.columns if column.key not in ('id', 'updated_at')]
+  values = []
+  for data in rows:
+    value = {name: data[name] for name in columns if name in data}
+    value['state'] = str(data['state'].value)
+    value['genres_mask'] = genres_mask(data['genres'])
+    value['updated_at'] = now
+    values.append(value)
+  if not values:
+    return
+
+  # Ids come back in no particular order, each with its row's genres
+  table = model.__table__
+  inserted = db.session.execute(table.insert().returning(table.c.id, table.c.genres_mask), values)
+  genre_rows = [{genre_key.key: id, 'genre': genre} for id, mask in inserted for genre in genre_ids(mask)]
+  if genre_rows:
+    db.session.execute(genre_model.__table__.insert(), genre_rows)
+
+def insert_shows(rows, errors):
+  '''Inserts validated show form data whose artist and venue exist.'''
+  shows = []
+  for number, data in rows:
+    try:
+      shows.append((number, int(data['artist_id']), int(data['venue_id']), data['start_time']))
+    except (TypeError, ValueError):
+      errors.append({"row": number, "errors": {"artist_id": ["Not a valid id."], "venue_id": ["Not a valid id."]}})
+
+  artist_ids = {id for id, in db.session.query(Artist.id).filter(Artist.id.in_({show[1] for show in shows}))}
+  venue_ids = {id for id, in db.session.query(Venue.id).filter(Venue.id.in_({show[2] for show in shows}))}
+
+  now = datetime.utcnow()
+  values = []
+  for number, artist_id, venue_id, start_time in shows:
+    if artist_id not in artist_ids or venue_id not in venue_ids:
+      errors.append({"row": number, "errors": {"artist_id" if artist_id not in artist_ids else "venue_id": ["Does not exist."]}})
+    else:
+      values.append({"artist_id": artist_id, "venue_id": venue_id, "start_time": start_time, "updated_at": now})
+
+  if values:
+    db.session.execute(Show.__table__.insert(), values)
+    stats.add_shows([(value['venue_id'], value['artist_id'], value['start_time']) for value in values])
+    touched_venues = {value['venue_id'] for value in values}
+    touched_artists = {value['artist_id'] for value in values}
+    Venue.query.filter(Venue.id.in_(touched_venues)).update({Venue.updated_at: now}, synchronize_session=False)
+    Artist.query.filter(Artist.id.in_(touched_artists)).update({Artist.updated_at: now}, synchronize_session=False)
+    cache.invalidate(
+      *[f'venue:{id}' for id in touched_venues],
+      *[f'artist:{id}' for id in touched_artists]
+    )
+
+  return len(values)
+
+def import_batch(kind, batch):
+  '''Validates a batch of (row number, record) pairs and inserts the valid
+  ones in one transaction. Returns the number inserted and the row errors.'''
+  import forms
+  # No formdata, each record is processed into it by validate()
+  form = getattr(forms, IMPORT_FORMS[kind])(formdata=None, meta={'csrf': False})
+  errors = []
+  rows = []
+  for number, record in batch:
+    if isinstance(record, MalformedRecord):
+      errors.append({"row": number, "errors": record.errors})
+      continue
+    data, form_errors = validate(form, record)
+    if form_errors:
+      errors.append({"row": number, "errors": form_errors})
+    else:
+      rows.append((number, data))
+
+  if kind == 'shows':
+    inserted = insert_shows(rows, errors)
+  elif kind == 'venues':
+    insert_profiles(Venue, VenueGenre, VenueGenre.venue_id, [data for number, data in rows])
+    inserted = len(rows)
+  else:
+    insert_profiles(Artist, ArtistGenre, ArtistGenre.artist_id, [data for number, data in rows])
+    inserted = len(rows)
+
+  db.session.commit()
+  cache.invalidate(kind, *(['venues', 'artists'] if kind == 'shows' else []))
+  return inserted, sorted(errors, key=lambda error: error['row'])
+
+def run_import(kind, records, batch_size, start=0, on_commit=None):
+  '''Imports records batch by batch, skipping the first `start` of them.
+
+  `on_commit(position)` is called with the number of records consumed after
+  each committed batch; resuming from that position imports the rest. A
+  database error rolls back the current batch and is raised.
+  '''
+  result = {"imported": 0, "errors": [], "position": start}
+  for batch in batches(records, batch_size, start):
+    try:
+      inserted, errors = import_batch(kind, batch)
+    except:
+      db.session.rollback()
+      raise
+    result['imported'] += inserted
+    result['errors'].extend(errors)
+    result['position'] = batch[-1][0]
+    if on_commit:
+      on_commit(result['position'])
+  return result
+
+@bp.route('/api/v1/import/<any(venues, artists, shows):kind>', methods=['POST'])
+def api_import(kind):
+  format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+  records = read_records(io.TextIOWrapper(request.stream, encoding='utf-8'), format)
+  result = run_import(kind, records, current_app.config['IMPORT_BATCH_SIZE'], request.args.get('start', 0, type=int))
+  return jsonify(result)
+
+@bp.cli.command('import')
+@click.argument('kind', type=click.Choice(['venues', 'artists', 'shows']))
+@click.argument('source', type=click.File('r'))
+@click.option('--format', 'format', type=click.Choice(['csv', 'ndjson']), help='Guessed from the file extension by default.')
+@click.option('--batch-size', type=int, help='Rows per transaction, IMPORT_BATCH_SIZE by default.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='File recording progress, an interrupted import resumes from it.')
+def import_command(kind, source, format, batch_size, checkpoint):
+  '''Bulk imports venues, artists or shows from CSV or NDJSON.'''
+  format = format or ('ndjson' if source.name.endswith(('.ndjson', '.jsonl')) else 'csv')
+  checkpoint = Checkpoint(checkpoint)
+  result = run_import(
+    kind,
+    read_records(source, format),
+    batch_size or current_app.config['IMPORT_BATCH_SIZE'],
+    checkpoint.load(),
+    checkpoint.save
+  )
+
+  for error in result['errors']:
+    click.echo(f"Row {error['row']}: {error['errors']}", err=True)
+  click.echo(f"Imported {result['imported']} {kind}, rejected {len(result['errors'])}.")
+
@@ -0,0 +1,121 @@
+import json
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per request SQL statistics, collected from the cursor events of every
+# engine (the primary and the replicas). Each request gets a Server-Timing
+# header and one JSON log line with its statement count, total database
+# time and slowest statement. Slow statements are logged with their plan,
+# and statements repeated more often than an N+1 loop would are warned of.
+
+class RequestStats:
+
+  def __init__(self, slow_query_ms):
+    self.count = 0
+    self.total = 0.0
+    self.slowest = (0.0, None)
+    self.statements = Counter()
+    self.slow_query_seconds = slow_query_ms / 1000
+    # (elapsed, statement, plan) of the statements slower than slow_query_ms
+    self.slow = []
+
+  def record(self, statement, elapsed):
+    self.count += 1
+    self.total += elapsed
+    self.statements[statement] += 1
+    if elapsed > self.slowest[0]:
+      self.slowest = (elapsed, statement)
+
+def explain(conn, statement, parameters):
+  '''Plan of a SELECT, from its own DBAPI cursor so no events fire for it.
+
+  EXPLAIN runs in a savepoint, rolled back to if it fails: on PostgreSQL a
+  failed statement would abort the transaction the request is still using.
+  '''
+  if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+    return None
+  prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+  cursor = conn.connection.cursor()
+  try:
+    cursor.execute('SAVEPOINT explain_plan')
+    try:
+      cursor.execute(prefix + statement, parameters)
+      plan = '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+    except Exception as error:
+      cursor.execute('ROLLBACK TO SAVEPOINT explain_plan')
+      plan = f'EXPLAIN failed: {error}'
+    cursor.execute('RELEASE SAVEPOINT explain_plan')
+    return plan
+  except Exception as error:
+    return f'EXPLAIN failed: {error}'
+  finally:
+    cursor.close()
+
+def start_timer(conn, cursor, statement, parameters, context, executemany):
+  conn.info['query_start'] = time.perf_counter()
+
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+  elapsed = time.perf_counter() - conn.info['query_start']
+  # The statements of aio.fetch_all() run on the event loop's thread and
+  # carry the request's stats in their options
+  stats = context.execution_options.get('sql_stats') if context is not None else None
+  if stats is None and has_request_context():
+    stats = g.get('sql_stats')
+  if stats is None:
+    return
+  stats.record(statement, elapsed)
+
+  if elapsed >= stats.slow_query_seconds and not executemany:
+    stats.slow.append((elapsed, statement, explain(conn, statement, parameters)))
+
+def start_request_stats():
+  g.sql_stats = RequestStats(current_app.config['SLOW_QUERY_MS'])
+
+def report_request_stats(response):
+  stats = g.pop('sql_stats', None)
+  if stats is None:
+    return response
+
+  response.headers.add('Server-Timing', f'db;dur={stats.total * 1000:.1f};desc="{stats.count} queries"')
+
+  current_app.logger.info(json.dumps({
+    "method": request.method,
+    "path": request.path,
+    "status": response.status_code,
+    "queries": stats.count,
+    "db_ms": round(stats.total * 1000, 1),
+    "slowest_ms": round(stats.slowest[0] * 1000, 1),
+    "slowest": stats.slowest[1],
+  }))
+
+  for elapsed, statement, plan in stats.slow:
+    current_app.logger.warning(
+      'Slow query (%.1f ms) on %s %s:\n%s\n%s',
+      elapsed * 1000, request.method, request.path, statement, plan
+    )
+
+  for statement, count in stats.statements.items():
+    if count > current_app.config['N_PLUS_ONE_THRESHOLD']:
+      current_app.logger.warning(
+        'Possible N+1: statement ran %d times on %s %s:\n%s',
+        count, request.method, request.path, statement
+      )
+  return response
+
+def init_app(app):
+  if not app.config.get('SQL_INSTRUMENTATION', True):
+    return
+  app.config.setdefault('SLOW_QUERY_MS', 200)
+  app.config.setdefault('N_PLUS_ONE_THRESHOLD', 10)
+
+  # Engine wide listeners see every engine, once however many apps there are;
+  # they only record while a request of an instrumented app collects stats
+  if not event.contains(Engine, 'before_cursor_execute', start_timer):
+    event.listen(Engine, 'before_cursor_execute', start_timer)
+    event.listen(Engine, 'after_cursor_execute', record_statement)
+
+  app.before_request(start_request_stats)
+  app.after_request(report_request_stats)
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from extensions import cache, db
+from models import Artist, Show, Venue
+
+# Venue.updated_at and Artist.updated_at change whenever their page does: the
+# write paths also touch the artists of an edited venue, the venues of an
+# edited artist, and both ends of a new show. Shows turning from upcoming to
+# past change the page without any write, so detail validators also account
+# for the start of the latest past show.
+
+def utc(value):
+  '''Naive updated_at values are UTC, naive start times are server local time.'''
+  return value.replace(tzinfo=timezone.utc)
+
+def detail_validators(model, column, entity_id):
+  updated_at = db.session.query(model.updated_at).filter(model.id == entity_id).scalar()
+  if updated_at is None:
+    return None
+
+  now = datetime.today()
+  upcoming_count, last_started_at = db.session.query(
+    db.func.count(db.case((Show.start_time >= now, 1))),
+    db.func.max(db.case((Show.start_time < now, Show.start_time)))
+  ).filter(column == entity_id).one()
+
+  last_modified = utc(updated_at)
+  if last_started_at is not None:
+    last_modified = max(last_modified, last_started_at.astimezone(timezone.utc))
+
+  return (upcoming_count,), last_modified
+
+def venue_validators(venue_id, **kwargs):
+  return detail_validators(Venue, Show.venue_id, venue_id)
+
+def artist_validators(artist_id, **kwargs):
+  return detail_validators(Artist, Show.artist_id, artist_id)
+
+def shows_validators(**kwargs):
+  # Each max() is answered by the updated_at index of its table
+  last_modified = max(
+    (utc(value) for value in db.session.query(
+      db.session.query(db.func.max(Show.updated_at)).scalar_subquery(),
+      db.session.query(db.func.max(Venue.updated_at)).scalar_subquery(),
+      db.session.query(db.func.max(Artist.updated_at)).scalar_subquery()
+    ).one() if value is not None),
+    default=datetime.fromtimestamp(0, timezone.utc)
+  )
+  return (), last_modified
+
+def touch_venue_artists(venue_id):
+  artist_ids = db.session.query(Show.artist_id).filter(Show.venue_id == venue_id)
+  Artist.query.filter(Artist.id.in_(artist_ids)) \
+    .update({Artist.updated_at: datetime.utcnow()}, synchronize_session=False)
+
+def touch_artist_venues(artist_id):
+  venue_ids = db.session.query(Show.venue_id).filter(Show.artist_id == artist_id)
+  Venue.query.filter(Venue.id.in_(venue_ids)) \
+    .update({Venue.updated_at: datetime.utcnow()}, synchronize_session=False)
+
+def invalidate_venue(venue_id, artist_ids=None):
+  '''Drops cached pages showing the venue: its own, the listings and its
+  artists'. Pass `artist_ids` when its shows are already deleted.'''
+  if artist_ids is None:
+    artist_ids = [artist_id for artist_id, in db.session.query(Show.artist_id).filter(Show.venue_id == venue_id).distinct()]
+  cache.invalidate(f'venue:{venue_id}', 'venues', 'shows', *[f'artist:{artist_id}' for artist_id in artist_ids])
+
+def invalidate_artist(artist_id):
+  '''Drops cached pages showing the artist: its own, the listings and its venues'.'''
+  venue_ids = db.session.query(Show.venue_id).filter(Show.artist_id == artist_id).distinct()
+  cache.invalidate(f'artist:{artist_id}', 'artists', 'shows', *[f'venue:{venue_id}' for venue_id, in venue_ids])
@@ -0,0 +1,59 @@
+import os
+import random
+from locust import HttpUser, between, task
+
+# Load profile for locust (pip install locust), against a server whose
+# database was filled by `flask seed`:
+#
+#   locust --host http://localhost:5000
+#
+# The mix follows production traffic: almost only reads, the detail pages
+# first, with a trickle of writes. VENUES, ARTISTS and SEARCH_TERMS must
+# match the seeded data.
+
+VENUES = int(os.environ.get('VENUES', 50000))
+ARTISTS = int(os.environ.get('ARTISTS', 200000))
+SEARCH_TERMS = os.environ.get('SEARCH_TERMS', 'Blue,Owl,Adler,Jazz,Stone,Neon').split(',')
+
+class Visitor(HttpUser):
+  wait_time = between(1, 5)
+
+  @task(10)
+  def show_venue(self):
+    self.client.get(f'/venues/{random.randint(1, VENUES)}', name='/venues/<id>')
+
+  @task(10)
+  def show_artist(self):
+    self.client.get(f'/artists/{random.randint(1, ARTISTS)}', name='/artists/<id>')
+
+  @task(5)
+  def venues(self):
+    self.client.get('/venues')
+
+  @task(5)
+  def artists(self):
+    self.client.get('/artists')
+
+  @task(5)
+  def shows(self):
+    self.client.get('/shows')
+
+  @task(3)
+  def search_venues(self):
+    self.client.post('/venues/search', data={'search_term': random.choice(SEARCH_TERMS)}, name='/venues/search')
+
+  @task(3)
+  def search_artists(self):
+    self.client.post('/artists/search', data={'search_term': random.choice(SEARCH_TERMS)}, name='/artists/search')
+
+  @task(2)
+  def browse(self):
+    self.client.get('/venues/browse?state=NY', name='/venues/browse')
+
+  @task(1)
+  def create_show(self):
+    self.client.post('/shows/create', data={
+      'venue_id': random.randint(1, VENUES),
+      'artist_id': random.randint(1, ARTISTS),
+      'start_time': '2030-01-01 20:00:00',
+    }, name='/shows/create')
@@ -0,0 +1,231 @@
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from flask import Blueprint, Response, current_app, g, request, template_rendered, before_render_template
+from sqlalchemy.pool import QueuePool
+from extensions import cache, db
+
+# Prometheus metrics of this process, served on /metrics in the text
+# exposition format. Every worker process keeps its own, so each one is
+# scraped (or the server runs one process with threads); so does every app
+# in a process, e.g. in tests.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+class Registry:
+  '''Counters, gauges and histograms sharded per thread.
+
+  Each thread only ever writes to its own shard, so recording a sample takes
+  no lock; the lock is only taken when a thread records its first sample,
+  when a finished thread's shard is folded into the totals of finished
+  threads, and when the shards are summed for a scrape. Servers starting a
+  thread per request thus keep one shard per live thread.
+  '''
+
+  def __init__(self):
+    self._metrics = {}
+    self._shards = {}
+    self._finished = {}
+    self._local = threading.local()
+    self._lock = threading.Lock()
+
+  def counter(self, name, help):
+    self._metrics[name] = ('counter', help, None)
+
+  def gauge(self, name, help):
+    self._metrics[name] = ('gauge', help, None)
+
+  def histogram(self, name, help, buckets):
+    self._metrics[name] = ('histogram', help, buckets)
+
+  def _shard(self):
+    shard = getattr(self._local, 'shard', None)
+    if shard is None:
+      shard = self._local.shard = {}
+      with self._lock:
+        self._shards[id(shard)] = shard
+      weakref.finalize(threading.current_thread(), self._retire, shard)
+    return shard
+
+  def _retire(self, shard):
+    # The thread is gone, nothing writes to its shard anymore
+    with self._lock:
+      del self._shards[id(shard)]
+      add_shard(self._finished, shard)
+
+  def inc(self, name, value=1, **labels):
+    shard = self._shard()
+    key = (name, tuple(sorted(labels.items())))
+    shard[key] = shard.get(key, 0) + value
+
+  def dec(self, name, **labels):
+    self.inc(name, -1, **labels)
+
+  def observe(self, name, value, **labels):
+    buckets = self._metrics[name][2]
+    shard = self._shard()
+    key = (name, tuple(sorted(labels.items())))
+    series = shard.get(key)
+    if series is None:
+      # One count per bucket, one for +Inf, then the sum
+      series = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+    series[bisect_left(buckets, value)] += 1
+    series[-1] += value
+
+  def collect(self):
+    '''Sums the shards into {(name, labels): value or histogram series}.'''
+    totals = {}
+    with self._lock:
+      add_shard(totals, self._finished)
+      shards = list(self._shards.values())
+    for shard in shards:
+      add_shard(totals, shard)
+    return totals
+
+  def render(self):
+    totals = self.collect()
+    lines = []
+    for name, (kind, help, buckets) in self._metrics.items():
+      lines.append(f'# HELP {name} {help}')
+      lines.append(f'# TYPE {name} {kind}')
+      for (series_name, labels), value in sorted(totals.items()):
+        if series_name != name:
+          continue
+        if kind != 'histogram':
+          lines.append(sample(name, labels, value))
+          continue
+        cumulative = 0
+        for bound, count in zip(buckets + (float('inf'),), value):
+          cumulative += count
+          lines.append(sample(f'{name}_bucket', labels + (('le', bound),), cumulative))
+        lines.append(sample(f'{name}_sum', labels, value[-1]))
+        lines.append(sample(f'{name}_count', labels, cumulative))
+    return lines
+
+def add_shard(totals, shard):
+  for key, value in list(shard.items()):
+    if isinstance(value, list):
+      total = totals.setdefault(key, [0] * len(value))
+      for index, item in enumerate(value):
+        total[index] += item
+    else:
+      totals[key] = totals.get(key, 0) + value
+
+def sample(name, labels, value):
+  def format_value(value):
+    if value == float('inf'):
+      return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+  if not labels:
+    return f'{name} {format_value(value)}'
+  pairs = ','.join(
+    '{}="{}"'.format(key, format_value(label).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+    for key, label in labels
+  )
+  return f'{name}{{{pairs}}} {format_value(value)}'
+
+def app_registry():
+  '''The metrics of an app, in app.extensions so each app counts its own.'''
+  registry = Registry()
+  registry.counter('http_requests_total', 'Requests answered, by endpoint, method and status.')
+  registry.histogram('http_request_duration_seconds', 'Request latency by endpoint.', LATENCY_BUCKETS)
+  registry.gauge('http_requests_in_flight', 'Requests being handled.')
+  registry.counter('http_errors_total', 'Responses of the 404 and 500 error handlers.')
+  registry.histogram('template_render_duration_seconds', 'Template render time by template.', LATENCY_BUCKETS)
+  registry.histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.', WAIT_BUCKETS)
+  return registry
+
+def timed_pool(registry):
+  '''A QueuePool class recording into `registry` how long each checkout
+  waited for a connection.'''
+
+  class TimedQueuePool(QueuePool):
+
+    def _do_get(self):
+      start = time.perf_counter()
+      try:
+        return super()._do_get()
+      finally:
+        registry.observe('db_pool_checkout_wait_seconds', time.perf_counter() - start)
+
+  return TimedQueuePool
+
+def current_registry():
+  return current_app.extensions['metrics']
+
+bp = Blueprint('metrics', __name__)
+
+@bp.route('/metrics')
+def metrics():
+  lines = current_registry().render()
+
+  engines = [('primary', db.engine)] + [
+    (f'replica{index}', engine) for index, engine in enumerate(current_app.extensions['replicas'].engines)
+  ]
+  pools = [(name, engine.pool) for name, engine in engines if isinstance(engine.pool, QueuePool)]
+  for name, help, value in [
+    ('db_pool_checked_out', 'Connections checked out of the pool.', lambda pool: pool.checkedout()),
+    ('db_pool_max_connections', 'pool_size plus max_overflow.', lambda pool: pool.size() + max(pool._max_overflow, 0)),
+    ('db_pool_saturation', 'Share of the pool connections checked out.',
+      lambda pool: pool.checkedout() / max(pool.size() + max(pool._max_overflow, 0), 1)),
+  ]:
+    lines.append(f'# HELP {name} {help}')
+    lines.append(f'# TYPE {name} gauge')
+    lines.extend(sample(name, (('pool', pool_name),), value(pool)) for pool_name, pool in pools)
+
+  stats = cache.stats()
+  lines.append('# HELP cache_requests_total Response cache lookups, by result.')
+  lines.append('# TYPE cache_requests_total counter')
+  lines.append(sample('cache_requests_total', (('result', 'hit'),), stats['hits']))
+  lines.append(sample('cache_requests_total', (('result', 'miss'),), stats['misses']))
+
+  return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+def start_request():
+  g.request_started_at = time.perf_counter()
+  current_registry().inc('http_requests_in_flight')
+
+def finish_request(response):
+  started = g.get('request_started_at')
+  if started is None:
+    return response
+  endpoint = request.endpoint or 'unmatched'
+  current_registry().observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+  current_registry().inc('http_requests_total', endpoint=endpoint, method=request.method, status=response.status_code)
+  return response
+
+def end_request(error=None):
+  if g.pop('request_started_at', None) is not None:
+    current_registry().dec('http_requests_in_flight')
+
+def start_render(app, template, context, **extra):
+  g.setdefault('render_started_at', []).append(time.perf_counter())
+
+def finish_render(app, template, context, **extra):
+  started = g.get('render_started_at')
+  if started:
+    current_registry().observe('template_render_duration_seconds', time.perf_counter() - started.pop(), template=template.name)
+
+def count_error(status):
+  current_registry().inc('http_errors_total', status=status)
+
+def init_app(app):
+  '''Installs the request hooks and times pool checkouts of QueuePool engines.
+
+  Must run before the engines are created.
+  '''
+  registry = app.extensions['metrics'] = app_registry()
+  options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+  if 'pool_size' in options and 'poolclass' not in options:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(options, poolclass=timed_pool(registry))
+
+  app.before_request(start_request)
+  app.after_request(finish_request)
+  app.teardown_request(end_request)
+  before_render_template.connect(start_render, app)
+  template_rendered.connect(finish_render, app)
+
+  app.register_blueprint(bp)
@@ -0,0 +1,28 @@
+"""Adds covering indexes for the browse facet counts to Venue, Artist
+
+Revision ID: 0b5e7c3a9d14
+Revises: a93c5e0d7b12
+Create Date: 2026-10-18 16:20:37.504118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5e7c3a9d14'
+down_revision = 'a93c5e0d7b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Each facet is counted with the other filters applied, every column they
+    # read is in the index so the counts never touch the table
+    op.create_index('ix_venue_browse_facets', 'Venue', ['state', 'seeking_talent', 'genres_mask', 'city'])
+    op.create_index('ix_artist_browse_facets', 'Artist', ['state', 'seeking_venue', 'genres_mask', 'city'])
+
+
+def downgrade():
+    op.drop_index('ix_artist_browse_facets', table_name='Artist')
+    op.drop_index('ix_venue_browse_facets', table_name='Venue')
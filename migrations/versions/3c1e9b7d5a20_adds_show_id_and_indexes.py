@@ -0,0 +1,35 @@
+"""Adds surrogate primary key and start_time indexes to Show
+
+Revision ID: 3c1e9b7d5a20
+Revises: da78b0d259fc
+Create Date: 2026-10-18 10:03:17.552910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1e9b7d5a20'
+down_revision = 'da78b0d259fc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_constraint('Show_pkey', 'Show', type_='primary')
+    # SERIAL numbers the existing rows as the column is added
+    op.execute('ALTER TABLE "Show" ADD COLUMN id SERIAL')
+    op.create_primary_key('Show_pkey', 'Show', ['id'])
+    op.create_index('ix_show_venue_id_start_time', 'Show', ['venue_id', 'start_time'])
+    op.create_index('ix_show_artist_id_start_time', 'Show', ['artist_id', 'start_time'])
+    op.create_index('ix_show_start_time', 'Show', ['start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_show_start_time', table_name='Show')
+    op.drop_index('ix_show_artist_id_start_time', table_name='Show')
+    op.drop_index('ix_show_venue_id_start_time', table_name='Show')
+    op.drop_constraint('Show_pkey', 'Show', type_='primary')
+    op.drop_column('Show', 'id')
+    op.create_primary_key('Show_pkey', 'Show', ['artist_id', 'venue_id'])
@@ -0,0 +1,36 @@
+"""Adds state, city and seeking indexes to Venue, Artist
+
+Revision ID: 5f0a8d2c7e16
+Revises: b7d3e05f9a41
+Create Date: 2026-10-18 13:52:19.618240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0a8d2c7e16'
+down_revision = 'b7d3e05f9a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_venue_state_city', 'Venue', ['state', 'city'])
+    op.create_index(
+        'ix_venue_seeking_talent_state_city', 'Venue', ['state', 'city'],
+        postgresql_where=sa.text('seeking_talent')
+    )
+    op.create_index('ix_artist_state_city', 'Artist', ['state', 'city'])
+    op.create_index(
+        'ix_artist_seeking_venue_state_city', 'Artist', ['state', 'city'],
+        postgresql_where=sa.text('seeking_venue')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_artist_seeking_venue_state_city', table_name='Artist')
+    op.drop_index('ix_artist_state_city', table_name='Artist')
+    op.drop_index('ix_venue_seeking_talent_state_city', table_name='Venue')
+    op.drop_index('ix_venue_state_city', table_name='Venue')
@@ -0,0 +1,34 @@
+"""Makes Venue state and city NOT NULL, indexes (state, city, id)
+
+Revision ID: 6d2f8b4e1a37
+Revises: 0b5e7c3a9d14
+Create Date: 2026-10-18 17:05:52.840216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2f8b4e1a37'
+down_revision = '0b5e7c3a9d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The /venues pages are keyed on (state, city, id), where a NULL would
+    # compare as unknown and the venue never be listed
+    op.execute('UPDATE "Venue" SET state = \'\' WHERE state IS NULL')
+    op.execute('UPDATE "Venue" SET city = \'\' WHERE city IS NULL')
+    op.alter_column('Venue', 'state', existing_type=sa.String(length=120), nullable=False)
+    op.alter_column('Venue', 'city', existing_type=sa.String(length=120), nullable=False)
+    op.create_index('ix_venue_state_city_id', 'Venue', ['state', 'city', 'id'])
+    op.drop_index('ix_venue_state_city', table_name='Venue')
+
+
+def downgrade():
+    op.create_index('ix_venue_state_city', 'Venue', ['state', 'city'])
+    op.drop_index('ix_venue_state_city_id', table_name='Venue')
+    op.alter_column('Venue', 'city', existing_type=sa.String(length=120), nullable=True)
+    op.alter_column('Venue', 'state', existing_type=sa.String(length=120), nullable=True)
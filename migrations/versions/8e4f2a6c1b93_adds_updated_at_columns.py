@@ -0,0 +1,35 @@
+"""Adds updated_at to Venue, Artist, Show
+
+Revision ID: 8e4f2a6c1b93
+Revises: 3c1e9b7d5a20
+Create Date: 2026-10-18 11:26:05.104877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f2a6c1b93'
+down_revision = '3c1e9b7d5a20'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ['Venue', 'Artist', 'Show']
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(), nullable=False,
+            server_default=sa.text("(now() at time zone 'utc')")
+        ))
+        op.alter_column(table, 'updated_at', server_default=None)
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'])
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
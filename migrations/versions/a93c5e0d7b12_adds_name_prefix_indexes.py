@@ -0,0 +1,34 @@
+"""Adds lower(name) prefix indexes to Venue, Artist for autocomplete
+
+Revision ID: a93c5e0d7b12
+Revises: e2b6d91c4f07
+Create Date: 2026-10-18 15:41:09.217604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93c5e0d7b12'
+down_revision = 'e2b6d91c4f07'
+branch_labels = None
+depends_on = None
+
+
+PREFIX_INDEXES = [
+    ('ix_venue_name_prefix', 'Venue'),
+    ('ix_artist_name_prefix', 'Artist'),
+]
+
+
+def upgrade():
+    # The "C" collation lets LIKE 'prefix%' use the index as a range and
+    # ORDER BY read it in order
+    for name, table in PREFIX_INDEXES:
+        op.create_index(name, table, [sa.text('lower(name) COLLATE "C"')])
+
+
+def downgrade():
+    for name, table in PREFIX_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""Moves Venue.genres, Artist.genres into venue_genre, artist_genre
+
+Revision ID: b7d3e05f9a41
+Revises: 8e4f2a6c1b93
+Create Date: 2026-10-18 12:40:52.730164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e05f9a41'
+down_revision = '8e4f2a6c1b93'
+branch_labels = None
+depends_on = None
+
+
+GENRE_TABLES = [
+    ('venue_genre', 'venue_id', 'Venue'),
+    ('artist_genre', 'artist_id', 'Artist'),
+]
+
+
+def upgrade():
+    for table, key, parent in GENRE_TABLES:
+        op.create_table(
+            table,
+            sa.Column(key, sa.Integer(), sa.ForeignKey(f'{parent}.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('genre', sa.Integer(), primary_key=True)
+        )
+        op.create_index(f'ix_{table}_genre_{key}', table, ['genre', key])
+        # genres held GenresEnum values joined with ';'
+        op.execute(f'''
+            INSERT INTO {table} ({key}, genre)
+            SELECT DISTINCT id, CAST(genre AS INTEGER)
+            FROM "{parent}", unnest(string_to_array(genres, ';')) AS genre
+            WHERE genre <> ''
+        ''')
+        op.drop_column(parent, 'genres')
+
+
+def downgrade():
+    for table, key, parent in GENRE_TABLES:
+        op.add_column(parent, sa.Column('genres', sa.String(length=120), nullable=True))
+        op.execute(f'''
+            UPDATE "{parent}" SET genres = (
+                SELECT string_agg(CAST(genre AS TEXT), ';' ORDER BY genre)
+                FROM {table} WHERE {key} = "{parent}".id
+            )
+        ''')
+        op.drop_index(f'ix_{table}_genre_{key}', table_name=table)
+        op.drop_table(table)
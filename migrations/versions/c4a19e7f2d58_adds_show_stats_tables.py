@@ -0,0 +1,53 @@
+"""Adds venue_stats, artist_stats and fills them from Show
+
+Revision ID: c4a19e7f2d58
+Revises: 5f0a8d2c7e16
+Create Date: 2026-10-18 14:20:37.481920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a19e7f2d58'
+down_revision = '5f0a8d2c7e16'
+branch_labels = None
+depends_on = None
+
+
+STATS_TABLES = [
+    ('venue_stats', 'venue_id', 'Venue'),
+    ('artist_stats', 'artist_id', 'Artist'),
+]
+
+
+def upgrade():
+    for table, key, parent in STATS_TABLES:
+        op.create_table(
+            table,
+            sa.Column(key, sa.Integer(), sa.ForeignKey(f'{parent}.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('upcoming_count', sa.Integer(), nullable=False),
+            sa.Column('past_count', sa.Integer(), nullable=False),
+            sa.Column('next_show_at', sa.DateTime(), nullable=True),
+            sa.Column('last_show_at', sa.DateTime(), nullable=True)
+        )
+        op.create_index(f'ix_{table}_next_show_at', table, ['next_show_at'])
+        # Start times are the app servers' local time; if the database's time
+        # zone differs, run `flask rebuild-stats` after upgrading
+        op.execute(f'''
+            INSERT INTO {table} ({key}, upcoming_count, past_count, next_show_at, last_show_at)
+            SELECT {key},
+                count(CASE WHEN start_time >= localtimestamp THEN 1 END),
+                count(CASE WHEN start_time < localtimestamp THEN 1 END),
+                min(CASE WHEN start_time >= localtimestamp THEN start_time END),
+                max(CASE WHEN start_time < localtimestamp THEN start_time END)
+            FROM "Show"
+            GROUP BY {key}
+        ''')
+
+
+def downgrade():
+    for table, key, parent in STATS_TABLES:
+        op.drop_index(f'ix_{table}_next_show_at', table_name=table)
+        op.drop_table(table)
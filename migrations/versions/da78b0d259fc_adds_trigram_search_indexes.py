@@ -0,0 +1,39 @@
+"""Adds trigram search indexes on Venue, Artist
+
+Revision ID: da78b0d259fc
+Revises: f5ad124991c5
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'da78b0d259fc'
+down_revision = 'f5ad124991c5'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_INDEXES = [
+    ('ix_venue_name_trgm', 'Venue', 'name'),
+    ('ix_venue_city_trgm', 'Venue', 'city'),
+    ('ix_artist_name_trgm', 'Artist', 'name'),
+    ('ix_artist_city_trgm', 'Artist', 'city'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in SEARCH_INDEXES:
+        op.create_index(
+            name, table, [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    for name, table, column in SEARCH_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,40 @@
+"""Adds Venue.genres_mask, Artist.genres_mask and fills them from the genre tables
+
+Revision ID: e2b6d91c4f07
+Revises: c4a19e7f2d58
+Create Date: 2026-10-18 15:02:44.906153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6d91c4f07'
+down_revision = 'c4a19e7f2d58'
+branch_labels = None
+depends_on = None
+
+
+GENRE_TABLES = [
+    ('venue_genre', 'venue_id', 'Venue'),
+    ('artist_genre', 'artist_id', 'Artist'),
+]
+
+
+def upgrade():
+    for table, key, parent in GENRE_TABLES:
+        op.add_column(parent, sa.Column('genres_mask', sa.Integer(), nullable=False, server_default='0'))
+        # Bit (genre - 1) for each GenresEnum value; (key, genre) is unique,
+        # so the sum sets each bit once
+        op.execute(f'''
+            UPDATE "{parent}" SET genres_mask = (
+                SELECT coalesce(sum(1 << (genre - 1)), 0)
+                FROM {table} WHERE {key} = "{parent}".id
+            )
+        ''')
+
+
+def downgrade():
+    for table, key, parent in GENRE_TABLES:
+        op.drop_column(parent, 'genres_mask')
@@ -0,0 +1,192 @@
+from datetime import datetime
+from enums import GenresEnum, genre_ids, genres_mask
+from sqlalchemy import DDL, column, event, table
+from extensions import db
+
+def name_prefix_index(prefix):
+    '''lower(name) in byte order, the range scan of queries.autocomplete(); the
+    "C" collation lets LIKE 'prefix%' use it. PostgreSQL only.'''
+    return db.Index(f'ix_{prefix}_name_prefix', db.text('lower(name) COLLATE "C"')).ddl_if(dialect='postgresql')
+
+def trigram_indexes(prefix):
+    '''pg_trgm GIN indexes on name and city, which serve the ILIKE filters of
+    queries.search_query(). PostgreSQL only, SQLite searches FTS5 tables.'''
+    return tuple(
+        db.Index(
+            f'ix_{prefix}_{name}_trgm', name, postgresql_using='gin', postgresql_ops={name: 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql')
+        for name in ('name', 'city')
+    )
+
+class Venue(db.Model):
+    __tablename__ = 'Venue'
+    __table_args__ = (
+        # Areas in order, the key of the /venues pages (see queries.venues_page())
+        db.Index('ix_venue_state_city_id', 'state', 'city', 'id'),
+        db.Index(
+            'ix_venue_seeking_talent_state_city', 'state', 'city',
+            postgresql_where=db.text('seeking_talent'), sqlite_where=db.text('seeking_talent')
+        ),
+        # Covers the browse facet counts, which filter on every other facet
+        db.Index('ix_venue_browse_facets', 'state', 'seeking_talent', 'genres_mask', 'city'),
+        *trigram_indexes('venue'),
+        name_prefix_index('venue'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(500)) 
+    facebook_link = db.Column(db.String(120))
+    website = db.Column(db.String(300)) 
+    seeking_talent = db.Column(db.Boolean()) 
+    seeking_description = db.Column(db.String(300)) 
+    updated_at = db.Column(db.DateTime, nullable=False, index=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Genres as a bitmask, see enums.genres_mask(); venue_genre holds the same set
+    genres_mask = db.Column(db.Integer, nullable=False, default=0)
+    genre_links = db.relationship('VenueGenre', cascade='all, delete-orphan')
+
+    @property
+    def genres(self):
+        return [GenresEnum(genre) for genre in genre_ids(self.genres_mask or 0)]
+
+    @genres.setter
+    def genres(self, genres):
+        genres = [GenresEnum.coerce(genre) for genre in genres]
+        self.genre_links = [VenueGenre(genre=genre.value) for genre in genres]
+        self.genres_mask = genres_mask(genres)
+        # The Venue row itself may be unchanged, its page is not
+        self.updated_at = datetime.utcnow()
+
+
+class Artist(db.Model):
+    __tablename__ = 'Artist'
+    __table_args__ = (
+        db.Index('ix_artist_state_city', 'state', 'city'),
+        db.Index(
+            'ix_artist_seeking_venue_state_city', 'state', 'city',
+            postgresql_where=db.text('seeking_venue'), sqlite_where=db.text('seeking_venue')
+        ),
+        db.Index('ix_artist_browse_facets', 'state', 'seeking_venue', 'genres_mask', 'city'),
+        *trigram_indexes('artist'),
+        name_prefix_index('artist'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    website = db.Column(db.String(300))
+    seeking_venue = db.Column(db.Boolean())
+    seeking_description = db.Column(db.String(300))
+    updated_at = db.Column(db.DateTime, nullable=False, index=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Genres as a bitmask, see enums.genres_mask(); artist_genre holds the same set
+    genres_mask = db.Column(db.Integer, nullable=False, default=0)
+    genre_links = db.relationship('ArtistGenre', cascade='all, delete-orphan')
+
+    @property
+    def genres(self):
+        return [GenresEnum(genre) for genre in genre_ids(self.genres_mask or 0)]
+
+    @genres.setter
+    def genres(self, genres):
+        genres = [GenresEnum.coerce(genre) for genre in genres]
+        self.genre_links = [ArtistGenre(genre=genre.value) for genre in genres]
+        self.genres_mask = genres_mask(genres)
+        # The Artist row itself may be unchanged, its page is not
+        self.updated_at = datetime.utcnow()
+
+# On SQLite, search reads FTS5 indexes of the names and cities, kept in step
+# with the tables by triggers. The trigram tokenizer matches any substring of
+# three characters or more, like the pg_trgm indexes on PostgreSQL.
+
+venue_search = table('venue_search', column('rowid'))
+artist_search = table('artist_search', column('rowid'))
+
+def add_search_index(model, index):
+    source, name = model.__tablename__, index.name
+    statements = [
+        f"CREATE VIRTUAL TABLE {name} USING fts5(name, city, content='{source}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER {name}_insert AFTER INSERT ON "{source}" BEGIN '
+        f'INSERT INTO {name}(rowid, name, city) VALUES (new.id, new.name, new.city); END',
+        f'CREATE TRIGGER {name}_delete AFTER DELETE ON "{source}" BEGIN '
+        f"INSERT INTO {name}({name}, rowid, name, city) VALUES ('delete', old.id, old.name, old.city); END",
+        f'CREATE TRIGGER {name}_update AFTER UPDATE OF name, city ON "{source}" BEGIN '
+        f"INSERT INTO {name}({name}, rowid, name, city) VALUES ('delete', old.id, old.name, old.city); "
+        f'INSERT INTO {name}(rowid, name, city) VALUES (new.id, new.name, new.city); END',
+    ]
+    for statement in statements:
+        event.listen(model.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(model.__table__, 'before_drop', DDL(f'DROP TABLE IF EXISTS {name}').execute_if(dialect='sqlite'))
+
+add_search_index(Venue, venue_search)
+add_search_index(Artist, artist_search)
+
+# The operator class of the trigram indexes
+event.listen(
+    db.Model.metadata, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
+# Genres are GenresEnum values, indexed by genre first so that finding the
+# venues or artists of a genre is an index range scan.
+
+class VenueGenre(db.Model):
+  __tablename__ = 'venue_genre'
+  __table_args__ = (
+    db.Index('ix_venue_genre_genre_venue_id', 'genre', 'venue_id'),
+  )
+
+  venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id', ondelete = 'CASCADE'), primary_key = True)
+  genre = db.Column(db.Integer, primary_key = True)
+
+class ArtistGenre(db.Model):
+  __tablename__ = 'artist_genre'
+  __table_args__ = (
+    db.Index('ix_artist_genre_genre_artist_id', 'genre', 'artist_id'),
+  )
+
+  artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id', ondelete = 'CASCADE'), primary_key = True)
+  genre = db.Column(db.Integer, primary_key = True)
+
+class Show(db.Model):
+  __tablename__ = 'Show'
+  __table_args__ = (
+    db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+    db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+    db.Index('ix_show_start_time', 'start_time'),
+  )
+
+  id = db.Column(db.Integer, primary_key = True)
+  artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id'), nullable = False)
+  venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable = False)
+  start_time = db.Column(db.DateTime)
+  updated_at = db.Column(db.DateTime, nullable = False, index = True, default = datetime.utcnow, onupdate = datetime.utcnow)
+
+# Show counts and the next and last show of each venue and artist, kept
+# current by stats.py so listings don't count shows on every request.
+
+class VenueStats(db.Model):
+  __tablename__ = 'venue_stats'
+
+  venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id', ondelete = 'CASCADE'), primary_key = True)
+  upcoming_count = db.Column(db.Integer, nullable = False, default = 0)
+  past_count = db.Column(db.Integer, nullable = False, default = 0)
+  # Rows whose next show has started are due for a rollover
+  next_show_at = db.Column(db.DateTime, index = True)
+  last_show_at = db.Column(db.DateTime)
+
+class ArtistStats(db.Model):
+  __tablename__ = 'artist_stats'
+
+  artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id', ondelete = 'CASCADE'), primary_key = True)
+  upcoming_count = db.Column(db.Integer, nullable = False, default = 0)
+  past_count = db.Column(db.Integer, nullable = False, default = 0)
+  next_show_at = db.Column(db.DateTime, index = True)
+  last_show_at = db.Column(db.DateTime)
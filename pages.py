@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify, render_template
+from extensions import cache
+import metrics
+
+bp = Blueprint('pages', __name__)
+
+@bp.route('/')
+@cache.cached()
+def index():
+  return render_template('pages/home.html')
+
+@bp.route('/cache/stats')
+def cache_stats():
+  return jsonify(cache.stats())
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    metrics.count_error(404)
+    return render_template('errors/404.html'), 404
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    metrics.count_error(500)
+    return render_template('errors/500.html'), 500
@@ -0,0 +1,54 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from flask import abort
+from sqlalchemy import DateTime, tuple_
+
+class Page:
+
+  def __init__(self, items, next_cursor):
+    self.items = items
+    self.next_cursor = next_cursor
+
+def encode_cursor(values):
+  payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+  return urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor, keys):
+  try:
+    values = json.loads(urlsafe_b64decode(cursor.encode()))
+    if len(values) != len(keys):
+      raise ValueError(cursor)
+    return [
+      datetime.fromisoformat(value) if isinstance(key.type, DateTime) else value
+      for key, value in zip(keys, values)
+    ]
+  except (ValueError, TypeError):
+    abort(400)
+
+def paginate(query, keys, cursor=None, per_page=20, descending=False):
+  '''Keyset pagination of `query`, ordered by the `keys` columns.
+
+  `keys` must be unique together and every key must be selected by the query
+  under its own name, so the cursor of the last row can be read back from it.
+  Rows after the cursor are found with a row-value comparison, which an index
+  on `keys` answers directly however deep the page is.
+  '''
+  return to_page(page_query(query, keys, cursor, per_page, descending).all(), keys, per_page)
+
+def page_query(query, keys, cursor=None, per_page=20, descending=False):
+  '''The query of one page, with one extra row telling if there's a next page.'''
+  if cursor:
+    position = tuple_(*decode_cursor(cursor, keys))
+    query = query.filter(tuple_(*keys) < position if descending else tuple_(*keys) > position)
+
+  ordering = [key.desc() for key in keys] if descending else keys
+  return query.order_by(*ordering).limit(per_page + 1)
+
+def to_page(rows, keys, per_page):
+  next_cursor = None
+  if len(rows) > per_page:
+    rows = rows[:per_page]
+    next_cursor = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+  return Page(rows, next_cursor)
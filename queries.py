@@ -0,0 +1,287 @@
+from datetime import datetime
+from flask import current_app
+from enums import genres_mask
+from extensions import db
+from models import Artist, ArtistGenre, ArtistStats, Show, Venue, VenueGenre, VenueStats, artist_search, venue_search
+from pagination import page_query, paginate, to_page
+
+def upcoming_shows_counts(model, ids):
+  '''Maps each venue or artist id to its number of upcoming shows, read from
+  venue_stats or artist_stats in one query. Ids without a row are left out.
+  '''
+  if not ids:
+    return {}
+
+  key, count = (VenueStats.venue_id, VenueStats.upcoming_count) if model is Venue \
+    else (ArtistStats.artist_id, ArtistStats.upcoming_count)
+  return dict(db.session.query(key, count).filter(key.in_(ids)).all())
+
+# Venues are paged by area, see venues_page()
+VENUE_KEYS = [Venue.state, Venue.city, Venue.id]
+
+def venues_page(cursor=None):
+  '''Venues with their upcoming show counts, ordered by area.
+
+  The counts come from venue_stats; the ordering keeps the venues of an area
+  together so they can be grouped in a single pass.
+  '''
+  return to_page(venues_page_query(cursor).all(), VENUE_KEYS, current_app.config['PAGE_SIZE'])
+
+def venues_page_query(cursor=None):
+  '''One page of venues, read in order from the (state, city, id) index.
+  State and city are NOT NULL, a NULL would drop out of the row comparison.
+  '''
+  venues_query = db.session.query(
+      Venue.id,
+      Venue.name,
+      Venue.city,
+      Venue.state,
+      db.func.coalesce(VenueStats.upcoming_count, 0).label('num_upcoming_shows')
+    ).outerjoin(VenueStats, VenueStats.venue_id == Venue.id)
+
+  return page_query(venues_query, VENUE_KEYS, cursor=cursor, per_page=current_app.config['PAGE_SIZE'])
+
+def artists_page(cursor=None):
+  return paginate(
+    db.session.query(Artist.id, Artist.name, Artist.city, Artist.state),
+    [Artist.id],
+    cursor=cursor,
+    per_page=current_app.config['PAGE_SIZE']
+  )
+
+def all_shows_page(cursor=None):
+  shows_query = db.session.query(
+      Show.id,
+      Show.start_time,
+      Show.venue_id,
+      Show.artist_id,
+      Venue.name.label('venue_name'),
+      Artist.name.label('artist_name'),
+      Artist.image_link.label('artist_image_link')
+    ).filter(Show.venue_id == Venue.id).filter(Show.artist_id == Artist.id)
+
+  return paginate(
+    shows_query,
+    [Show.start_time, Show.id],
+    cursor=cursor,
+    per_page=current_app.config['PAGE_SIZE']
+  )
+
+def export_query(kind):
+  '''Every show (with its venue and artist names), venue or artist, by id.
+
+  Venues and artists carry their genres mask as `genres`, for the export to
+  decode; updated_at is left out.
+  '''
+  if kind == 'shows':
+    return db.session.query(
+        Show.id,
+        Show.start_time,
+        Show.venue_id,
+        Venue.name.label('venue_name'),
+        Show.artist_id,
+        Artist.name.label('artist_name')
+      ).join(Venue, Show.venue_id == Venue.id).join(Artist, Show.artist_id == Artist.id).order_by(Show.id)
+
+  model = Venue if kind == 'venues' else Artist
+  columns = [column for column in model.__table__.columns if column.key not in ('genres_mask', 'updated_at')]
+  return db.session.query(*columns, model.genres_mask.label('genres')).order_by(model.id)
+
+# Shortest term the trigram indexes can look up, shorter ones scan the table
+TRIGRAM_LENGTH = 3
+
+def search_query(model, search_term):
+  '''The (id, name, city, state) of venues or artists whose name or city
+  contains `search_term`, and the rank to order them by.
+
+  On PostgreSQL the ILIKE predicates are served by the pg_trgm GIN indexes and
+  results are ranked by trigram similarity. On SQLite the venue_search and
+  artist_search FTS5 tables are matched instead and results ranked by bm25,
+  name hits weighing more than city hits. Terms too short for a trigram scan
+  the table, ranking name matches ahead of city matches. The rank is labelled
+  `rank`, lower is better.
+  '''
+  pattern = f'%{ search_term }%'
+  query = db.session.query(model.id, model.name, model.city, model.state)
+
+  if db.engine.dialect.name == 'postgresql':
+    rank = -db.func.greatest(
+      db.func.similarity(model.name, search_term),
+      db.func.similarity(model.city, search_term)
+    )
+    query = query.filter(db.or_(model.name.ilike(pattern), model.city.ilike(pattern)))
+  elif db.engine.dialect.name == 'sqlite' and len(search_term) >= TRIGRAM_LENGTH:
+    index = venue_search if model is Venue else artist_search
+    rank = db.func.bm25(db.literal_column(index.name), 10.0, 1.0)
+    # Quoted as an FTS5 string, the term matches as one substring
+    phrase = '"' + search_term.replace('"', '""') + '"'
+    query = query.join(index, index.c.rowid == model.id).filter(db.literal_column(index.name).match(phrase))
+  else:
+    rank = db.case((model.name.ilike(pattern), 0), else_=1)
+    query = query.filter(db.or_(model.name.ilike(pattern), model.city.ilike(pattern)))
+  return query, rank.label('rank')
+
+def search(model, search_term, cursor=None):
+  '''One page of the venues or artists matching `search_term`, best match
+  first, see search_query(). Pages are keyed on (rank, name, id).'''
+  query, rank = search_query(model, search_term)
+  return paginate(
+    query.add_columns(rank),
+    [rank, model.name, model.id],
+    cursor=cursor,
+    per_page=current_app.config['PAGE_SIZE']
+  )
+
+def search_count(model, search_term):
+  '''How many venues or artists match `search_term` across all pages.'''
+  query, rank = search_query(model, search_term)
+  return query.count()
+
+def autocomplete(model, prefix, limit=10):
+  '''Up to `limit` (id, name) of venues or artists whose name starts with
+  `prefix`, ignoring case, by name.
+
+  On PostgreSQL the lower(name) COLLATE "C" indexes turn the prefix into a
+  range scan already in name order, which stops after `limit` rows.
+  '''
+  name = db.func.lower(model.name)
+  if db.engine.dialect.name == 'postgresql':
+    name = name.collate('C')
+  pattern = prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+  return db.session.query(model.id, model.name) \
+    .filter(name.like(pattern, escape='\\')) \
+    .order_by(name, model.id) \
+    .limit(limit) \
+    .all()
+
+def browse(model, filters, cursor=None):
+  '''Venues or artists matching every filter, plus facet counts.
+
+  `filters` may hold 'state' (StateEnum), 'city', 'genre' (a list of
+  GenresEnum, matching any of them) and 'seeking' (bool). Results are a keyset page by id. Each facet is counted
+  with every filter but its own, all facets in one UNION ALL statement; cities
+  are only counted once a state is chosen.
+  '''
+  if model is Venue:
+    genre_model, genre_key, seeking = VenueGenre, VenueGenre.venue_id, Venue.seeking_talent
+  else:
+    genre_model, genre_key, seeking = ArtistGenre, ArtistGenre.artist_id, Artist.seeking_venue
+  seeking_value = db.case((seeking.is_(True), 'true'), (seeking.is_(False), 'false'))
+
+  predicates = {}
+  if 'state' in filters:
+    predicates['state'] = model.state == str(filters['state'].value)
+  if 'city' in filters:
+    predicates['city'] = model.city == filters['city']
+  if 'genre' in filters:
+    predicates['genre'] = model.genres_mask.op('&')(genres_mask(filters['genre'])) != 0
+  if 'seeking' in filters:
+    predicates['seeking'] = seeking.is_(filters['seeking'])
+
+  def all_but(facet):
+    return [predicate for name, predicate in predicates.items() if name != facet]
+
+  page = paginate(
+    db.session.query(model.id, model.name, model.city, model.state).filter(*predicates.values()),
+    [model.id],
+    cursor=cursor,
+    per_page=current_app.config['PAGE_SIZE']
+  )
+
+  facet_queries = [
+    db.session.query(db.literal('state'), model.state, db.func.count()) \
+      .filter(*all_but('state')).group_by(model.state),
+    db.session.query(db.literal('genre'), db.cast(genre_model.genre, db.String), db.func.count()) \
+      .join(model, model.id == genre_key).filter(*all_but('genre')).group_by(genre_model.genre),
+    db.session.query(db.literal('seeking'), seeking_value, db.func.count()) \
+      .filter(*all_but('seeking')).group_by(seeking_value),
+  ]
+  if 'state' in filters:
+    facet_queries.append(
+      db.session.query(db.literal('city'), model.city, db.func.count()) \
+        .filter(*all_but('city')).group_by(model.city)
+    )
+
+  facets = {'state': [], 'city': [], 'genre': [], 'seeking': []}
+  for facet, value, count in facet_queries[0].union_all(*facet_queries[1:]).all():
+    # Rows without a state or city can't be filtered on, so get no facet value
+    if value not in (None, ''):
+      facets[facet].append((value, count))
+
+  return page, facets
+
+def venue_shows_query(venue_id):
+  return db.session.query(
+      Show.id,
+      Show.start_time,
+      Artist.id.label('artist_id'),
+      Artist.name.label('artist_name'),
+      Artist.image_link.label('artist_image_link')
+    ).join(Artist, Show.artist_id == Artist.id).filter(Show.venue_id == venue_id)
+
+def artist_shows_query(artist_id):
+  return db.session.query(
+      Show.id,
+      Show.start_time,
+      Venue.id.label('venue_id'),
+      Venue.name.label('venue_name'),
+      Venue.image_link.label('venue_image_link')
+    ).join(Venue, Show.venue_id == Venue.id).filter(Show.artist_id == artist_id)
+
+# Shows of a venue or artist are paged by start time, see shows_page()
+SHOW_KEYS = [Show.start_time, Show.id]
+
+def shows_page(query, when, cursor=None):
+  '''One page of upcoming shows (soonest first) or past shows (latest first).
+
+  Both directions walk the (venue_id|artist_id, start_time) indexes, so a page
+  costs the same however long the venue's or artist's history is.
+  '''
+  return shows_page_rows(shows_page_query(query, when, cursor).all())
+
+def shows_page_query(query, when, cursor=None):
+  now = datetime.today()
+  if when == 'upcoming':
+    query = query.filter(Show.start_time >= now)
+  else:
+    query = query.filter(Show.start_time < now)
+
+  return page_query(
+    query,
+    SHOW_KEYS,
+    cursor=cursor,
+    per_page=current_app.config['SHOWS_PAGE_SIZE'],
+    descending=when == 'past'
+  )
+
+def shows_page_rows(rows):
+  return to_page(rows, SHOW_KEYS, current_app.config['SHOWS_PAGE_SIZE'])
+
+def venue_detail_queries(venue_id):
+  '''The independent queries of a venue page: its row with its show counts
+  and the first pages of upcoming and past shows.
+
+  Read them with aio.fetch_all(), which runs them concurrently in ASGI mode.
+  '''
+  return (
+    db.session.query(
+      *Venue.__table__.columns,
+      db.func.coalesce(VenueStats.upcoming_count, 0).label('upcoming_shows_count'),
+      db.func.coalesce(VenueStats.past_count, 0).label('past_shows_count')
+    ).outerjoin(VenueStats, VenueStats.venue_id == Venue.id).filter(Venue.id == venue_id),
+    shows_page_query(venue_shows_query(venue_id), 'upcoming'),
+    shows_page_query(venue_shows_query(venue_id), 'past'),
+  )
+
+def artist_detail_queries(artist_id):
+  '''The independent queries of an artist page, see venue_detail_queries().'''
+  return (
+    db.session.query(
+      *Artist.__table__.columns,
+      db.func.coalesce(ArtistStats.upcoming_count, 0).label('upcoming_shows_count'),
+      db.func.coalesce(ArtistStats.past_count, 0).label('past_shows_count')
+    ).outerjoin(ArtistStats, ArtistStats.artist_id == Artist.id).filter(Artist.id == artist_id),
+    shows_page_query(artist_shows_query(artist_id), 'upcoming'),
+    shows_page_query(artist_shows_query(artist_id), 'past'),
+  )
@@ -0,0 +1,105 @@
+import itertools
+import threading
+import time
+import sqlalchemy
+from flask import g, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+# Read replica routing. GET and HEAD requests, and views marked @read_only,
+# read from a replica chosen round-robin among the healthy ones; everything
+# else, every write and every request without a replica (CLI commands, a
+# client that just posted) uses the primary.
+
+def read_only(view):
+  '''Marks a view that only reads whatever the method, like the POST of a
+  search form, so that it is routed like a GET.'''
+  view.read_only = True
+  return view
+
+def is_read(app):
+  '''Whether the current request only reads.'''
+  view = app.view_functions.get(request.endpoint)
+  return request.method in ('GET', 'HEAD') or getattr(view, 'read_only', False)
+
+class ReplicaSet:
+  '''Engines of the read replicas, with a periodic health check each.
+
+  A replica is checked with SELECT 1 when it is picked and its last check is
+  older than `health_interval` seconds; one that fails is skipped until its
+  next check. When no replica is healthy, reads go to the primary.
+  '''
+
+  def __init__(self, urls, engine_options, health_interval=10):
+    self.engines = [sqlalchemy.create_engine(url, **engine_options) for url in urls]
+    self.health_interval = health_interval
+    self._healthy = [True] * len(self.engines)
+    self._checked_at = [0.0] * len(self.engines)
+    self._turns = itertools.count()
+    self._lock = threading.Lock()
+
+  def choose(self):
+    '''Returns the next healthy replica engine, or None.'''
+    if not self.engines:
+      return None
+    with self._lock:
+      start = next(self._turns)
+    for offset in range(len(self.engines)):
+      index = (start + offset) % len(self.engines)
+      if self._is_healthy(index):
+        return self.engines[index]
+    return None
+
+  def _is_healthy(self, index):
+    now = time.monotonic()
+    if now - self._checked_at[index] >= self.health_interval:
+      self._checked_at[index] = now
+      try:
+        with self.engines[index].connect() as connection:
+          connection.execute(sqlalchemy.text('SELECT 1'))
+        self._healthy[index] = True
+      except sqlalchemy.exc.DBAPIError:
+        self._healthy[index] = False
+    return self._healthy[index]
+
+class RoutingSession(Session):
+  '''Sends the statements of a read-only request to its replica.
+
+  The session class of `db`, see extensions.py.
+  '''
+
+  def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+    replica = g.get('db_replica')
+    if replica is None or bind is not None or self._flushing or isinstance(clause, UpdateBase):
+      return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+    return replica
+
+def init_app(app):
+  '''Reads SQLALCHEMY_REPLICA_URIS and hooks replica selection into requests.'''
+  replicas = ReplicaSet(
+    app.config.get('SQLALCHEMY_REPLICA_URIS', []),
+    app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    app.config.get('REPLICA_HEALTH_INTERVAL', 10)
+  )
+  app.extensions['replicas'] = replicas
+  if not replicas.engines:
+    return
+
+  sticky_seconds = app.config.get('READ_AFTER_WRITE_SECONDS', 5)
+
+  @app.before_request
+  def choose_replica():
+    # Replicas lag behind the primary, so a client that just wrote reads its
+    # own writes from the primary for a few seconds. The choice is reset on
+    # every request, as an app context may outlive one (in tests).
+    g.db_replica = None
+    if is_read(app) and session.get('primary_until', 0) < time.time():
+      g.db_replica = replicas.choose()
+
+  @app.after_request
+  def stick_to_primary(response):
+    if request.method != 'OPTIONS' and not is_read(app) and response.status_code < 400:
+      session['primary_until'] = time.time() + sticky_seconds
+    return response
+
+  app.logger.info('Read replicas: %d', len(replicas.engines))
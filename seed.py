@@ -0,0 +1,157 @@
+import random
+from datetime import datetime, timedelta
+import click
+from flask import Blueprint
+from enums import GenresEnum, StateEnum
+from extensions import cache, db
+from models import Artist, ArtistGenre, Show, Venue, VenueGenre
+import stats
+
+# Synthetic data for load tests and benchmarks, at production-like volumes.
+# Rows go in with executemany in batches of one transaction each; the same
+# --seed always produces the same data.
+
+bp = Blueprint('seed', __name__, cli_group=None)
+
+ADJECTIVES = [
+  'Blue', 'Golden', 'Electric', 'Velvet', 'Silent', 'Crimson', 'Wild', 'Hidden', 'Midnight', 'Copper',
+  'Neon', 'Rusty', 'Lucky', 'Broken', 'Little', 'Grand', 'Lonely', 'Burning', 'Northern', 'Silver',
+]
+NOUNS = [
+  'Owl', 'Lantern', 'Harbor', 'Garden', 'Engine', 'Parlor', 'Echo', 'Cellar', 'Anchor', 'Orchard',
+  'Tiger', 'Mirror', 'Rail', 'Canyon', 'Comet', 'Hollow', 'Tavern', 'Meadow', 'Signal', 'Foundry',
+]
+VENUE_KINDS = ['Hall', 'Club', 'Lounge', 'Theatre', 'Bar', 'Room', 'Stage', 'Arena']
+FIRST_NAMES = [
+  'Ada', 'Ben', 'Cleo', 'Dev', 'Ella', 'Finn', 'Gia', 'Hugo', 'Iris', 'Jude',
+  'Kai', 'Lena', 'Milo', 'Nina', 'Otis', 'Pia', 'Quinn', 'Rosa', 'Sam', 'Tess',
+]
+LAST_NAMES = [
+  'Adler', 'Brooks', 'Castro', 'Dunn', 'Ellis', 'Flores', 'Grant', 'Hayes', 'Ibarra', 'Jensen',
+  'Keller', 'Lowe', 'Moreno', 'Nash', 'Ortiz', 'Price', 'Reyes', 'Stone', 'Tran', 'Vance',
+]
+CITY_PARTS = ['Spring', 'Oak', 'River', 'Lake', 'Fair', 'Green', 'Clear', 'Maple', 'Cedar', 'Pine']
+CITY_SUFFIXES = ['field', 'ville', 'ton', 'port', 'dale', ' City', 'burg', 'wood']
+STREETS = ['Main St', 'Oak Ave', 'Market St', '2nd Ave', 'Broadway', 'Elm St', 'Park Blvd', 'Mill Rd']
+
+def cities(rng, count=400):
+  '''(city, state) pairs; every venue and artist lives in one of them.'''
+  states = list(StateEnum)
+  return [
+    (rng.choice(CITY_PARTS) + rng.choice(CITY_SUFFIXES), str(rng.choice(states).value))
+    for _ in range(count)
+  ]
+
+def profile(rng, name, city, now):
+  slug = name.lower().replace(' ', '')
+  return {
+    'name': name,
+    'city': city[0],
+    'state': city[1],
+    'phone': f'{rng.randrange(10 ** 8, 10 ** 9)}',
+    'image_link': f'https://images.example.com/{slug}.jpg',
+    'facebook_link': f'https://www.facebook.com/{slug}',
+    'website': f'https://{slug}.example.com',
+    'seeking_description': None,
+    'updated_at': now,
+  }
+
+def venue_rows(rng, count, places, now):
+  for number in range(count):
+    name = f'The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice(VENUE_KINDS)} {number}'
+    row = profile(rng, name, rng.choice(places), now)
+    row['address'] = f'{rng.randrange(1, 2000)} {rng.choice(STREETS)}'
+    row['seeking_talent'] = rng.random() < 0.3
+    yield row
+
+def artist_rows(rng, count, places, now):
+  for number in range(count):
+    if rng.random() < 0.5:
+      name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}'
+    else:
+      name = f'The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}s {number}'
+    row = profile(rng, name, rng.choice(places), now)
+    row['seeking_venue'] = rng.random() < 0.3
+    yield row
+
+def set_genres_masks(model, genre_model, genre_key, ids):
+  '''Sets genres_mask from the genre rows, see enums.genres_mask().'''
+  mask = db.session.query(db.func.coalesce(db.func.sum(db.literal(1).op('<<')(genre_model.genre - 1)), 0)) \
+    .filter(genre_key == model.id).scalar_subquery()
+  db.session.query(model).filter(model.id.between(*ids)).update({model.genres_mask: mask}, synchronize_session=False)
+  db.session.commit()
+
+def genre_rows(rng, key, ids):
+  genres = [genre.value for genre in GenresEnum]
+  for id in ids:
+    for genre in rng.sample(genres, rng.randint(1, 3)):
+      yield {key: id, 'genre': genre}
+
+def show_rows(rng, count, venue_ids, artist_ids, now):
+  # Two years of history and one of upcoming shows, in the evening
+  for _ in range(count):
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=rng.randint(-730, 365))
+    yield {
+      'venue_id': rng.randint(*venue_ids),
+      'artist_id': rng.randint(*artist_ids),
+      'start_time': day + timedelta(hours=rng.randint(18, 23), minutes=rng.choice((0, 30))),
+      'updated_at': now,
+    }
+
+def insert(table, rows, batch_size, label):
+  inserted = 0
+  batch = []
+  for row in rows:
+    batch.append(row)
+    if len(batch) == batch_size:
+      inserted += flush(table, batch)
+      click.echo(f'{label}: {inserted}')
+  inserted += flush(table, batch)
+  click.echo(f'{label}: {inserted}')
+
+def flush(table, batch):
+  if not batch:
+    return 0
+  db.session.execute(table.insert(), batch)
+  db.session.commit()
+  count = len(batch)
+  batch.clear()
+  return count
+
+def max_id(model):
+  return db.session.query(db.func.coalesce(db.func.max(model.id), 0)).scalar()
+
+def new_ids(model, rows, batch_size, label):
+  '''Inserts the rows and returns the (first, last) id they were given, last
+  being below first when there were no rows.'''
+  before = max_id(model)
+  insert(model.__table__, rows, batch_size, label)
+  return before + 1, max_id(model)
+
+def seed(venues, artists, shows, batch_size=10000, seed=0):
+  '''Inserts synthetic venues, artists and shows, see `flask seed`.'''
+  rng = random.Random(seed)
+  now = datetime.utcnow()
+  places = cities(rng)
+
+  venue_ids = new_ids(Venue, venue_rows(rng, venues, places, now), batch_size, 'Venues')
+  insert(VenueGenre.__table__, genre_rows(rng, 'venue_id', range(venue_ids[0], venue_ids[1] + 1)), batch_size, 'Venue genres')
+  set_genres_masks(Venue, VenueGenre, VenueGenre.venue_id, venue_ids)
+  artist_ids = new_ids(Artist, artist_rows(rng, artists, places, now), batch_size, 'Artists')
+  insert(ArtistGenre.__table__, genre_rows(rng, 'artist_id', range(artist_ids[0], artist_ids[1] + 1)), batch_size, 'Artist genres')
+  set_genres_masks(Artist, ArtistGenre, ArtistGenre.artist_id, artist_ids)
+  if venues and artists:
+    insert(Show.__table__, show_rows(rng, shows, venue_ids, artist_ids, datetime.today()), batch_size, 'Shows')
+
+  stats.rebuild()
+  cache.invalidate('venues', 'artists', 'shows')
+
+@bp.cli.command('seed')
+@click.option('--venues', default=50000, show_default=True)
+@click.option('--artists', default=200000, show_default=True)
+@click.option('--shows', default=2000000, show_default=True)
+@click.option('--batch-size', default=10000, show_default=True, help='Rows per transaction.')
+@click.option('--seed', 'seed_number', default=0, show_default=True, help='Random seed, the same seed generates the same data.')
+def seed_command(venues, artists, shows, batch_size, seed_number):
+  '''Fills the database with synthetic venues, artists and shows.'''
+  seed(venues, artists, shows, batch_size, seed_number)
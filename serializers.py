@@ -0,0 +1,104 @@
+from enums import genre_names, state_name
+
+# Serializers for the JSON API. They read only the columns the queries
+# selected, never relationships, so serializing a page costs no queries.
+
+def select_fields(data, fields):
+  '''Keeps only the requested top-level keys of a dict or list of dicts.'''
+  if not fields:
+    return data
+  if isinstance(data, list):
+    return [select_fields(item, fields) for item in data]
+  return {key: value for key, value in data.items() if key in fields}
+
+def timestamp(value):
+  return value.isoformat() if value else None
+
+def venue_summary(venue, num_upcoming_shows):
+  return {
+    "id": venue.id,
+    "name": venue.name,
+    "city": venue.city,
+    "state": state_name(venue.state),
+    "num_upcoming_shows": num_upcoming_shows
+  }
+
+def artist_summary(artist, num_upcoming_shows):
+  return {
+    "id": artist.id,
+    "name": artist.name,
+    "city": artist.city,
+    "state": state_name(artist.state),
+    "num_upcoming_shows": num_upcoming_shows
+  }
+
+def show_summary(show):
+  return {
+    "id": show.id,
+    "start_time": timestamp(show.start_time),
+    "venue_id": show.venue_id,
+    "venue_name": show.venue_name,
+    "artist_id": show.artist_id,
+    "artist_name": show.artist_name,
+    "artist_image_link": show.artist_image_link
+  }
+
+def venue_show(show):
+  return {
+    "id": show.id,
+    "start_time": timestamp(show.start_time),
+    "artist_id": show.artist_id,
+    "artist_name": show.artist_name,
+    "artist_image_link": show.artist_image_link
+  }
+
+def artist_show(show):
+  return {
+    "id": show.id,
+    "start_time": timestamp(show.start_time),
+    "venue_id": show.venue_id,
+    "venue_name": show.venue_name,
+    "venue_image_link": show.venue_image_link
+  }
+
+def shows_section(page, count, serializer):
+  return {
+    "count": count,
+    "items": [serializer(show) for show in page.items],
+    "next_cursor": page.next_cursor
+  }
+
+def venue_detail(venue, upcoming_shows, past_shows):
+  return {
+    "id": venue.id,
+    "name": venue.name,
+    "genres": genre_names(venue.genres_mask),
+    "address": venue.address,
+    "city": venue.city,
+    "state": state_name(venue.state),
+    "phone": venue.phone,
+    "website": venue.website,
+    "facebook_link": venue.facebook_link,
+    "seeking_talent": venue.seeking_talent,
+    "seeking_description": venue.seeking_description,
+    "image_link": venue.image_link,
+    "upcoming_shows": shows_section(upcoming_shows, venue.upcoming_shows_count, venue_show),
+    "past_shows": shows_section(past_shows, venue.past_shows_count, venue_show)
+  }
+
+def artist_detail(artist, upcoming_shows, past_shows):
+  return {
+    "id": artist.id,
+    "name": artist.name,
+    "genres": genre_names(artist.genres_mask),
+    "city": artist.city,
+    "state": state_name(artist.state),
+    "phone": artist.phone,
+    "website": artist.website,
+    "facebook_link": artist.facebook_link,
+    "seeking_venue": artist.seeking_venue,
+    "seeking_description": artist.seeking_description,
+    "image_link": artist.image_link,
+    "upcoming_shows": shows_section(upcoming_shows, artist.upcoming_shows_count, artist_show),
+    "past_shows": shows_section(past_shows, artist.past_shows_count, artist_show)
+  }
@@ -0,0 +1,68 @@
+from datetime import datetime
+from flask import Blueprint, flash, render_template, request
+from cache import conditional
+from extensions import cache, db
+from invalidation import shows_validators
+from models import Artist, Show, Venue
+from queries import all_shows_page
+import stats
+
+bp = Blueprint('shows', __name__)
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+@conditional(shows_validators)
+@cache.cached('shows')
+def shows():
+  page = all_shows_page(request.args.get('after'))
+
+  data=[]
+  for show in page.items:
+    data.append({
+      "venue_id": show.venue_id,
+      "venue_name": show.venue_name,
+      "artist_id": show.artist_id,
+      "artist_name": show.artist_name,
+      "artist_image_link": show.artist_image_link,
+      "start_time": show.start_time
+    })
+
+  return render_template('pages/shows.html', shows=data, next_cursor=page.next_cursor)
+
+@bp.route('/shows/create')
+def create_shows():
+  # renders form. do not touch.
+  from forms import ShowForm
+  form = ShowForm()
+  return render_template('forms/new_show.html', form=form)
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+  try:
+    from dateutil import parser
+    artist = request.form.get('artist_id')
+    venue = request.form.get('venue_id')
+    start_time = parser.parse(request.form.get('start_time'))
+
+    show = Show(
+      artist_id = artist, 
+      venue_id = venue, 
+      start_time = start_time
+    )
+    db.session.add(show)
+    Venue.query.filter(Venue.id == venue).update({Venue.updated_at: datetime.utcnow()}, synchronize_session=False)
+    Artist.query.filter(Artist.id == artist).update({Artist.updated_at: datetime.utcnow()}, synchronize_session=False)
+    stats.add_shows([(int(venue), int(artist), start_time)])
+    db.session.commit()
+    cache.invalidate(f'venue:{venue}', f'artist:{artist}', 'venues', 'artists', 'shows')
+
+    flash('Show was successfully listed!')
+
+  except:
+    db.session.rollback()
+
+    flash('An error occurred. Show could not be listed.')
+
+  return render_template('pages/home.html')
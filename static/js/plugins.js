@@ -18,3 +18,50 @@ window.log = function(){
 
 // place any jQuery/helper plugins in here, instead of separate, slower script files.
 
+
+// "Load more" buttons on the venue and artist pages: fetch the next page of
+// shows from the button's data-url and append the tiles to the row above it.
+(function() {
+  var buttons = document.querySelectorAll('.load-more');
+
+  function showTile(show) {
+    var column = document.createElement('div');
+    column.className = 'col-sm-4';
+    var tile = document.createElement('div');
+    tile.className = 'tile tile-show';
+    var image = document.createElement('img');
+    image.src = show.image_link;
+    image.alt = 'Show Image';
+    var title = document.createElement('h5');
+    var link = document.createElement('a');
+    link.href = show.url;
+    link.textContent = show.name;
+    var time = document.createElement('h6');
+    time.textContent = show.start_time;
+    title.appendChild(link);
+    tile.appendChild(image);
+    tile.appendChild(title);
+    tile.appendChild(time);
+    column.appendChild(tile);
+    return column;
+  }
+
+  Array.prototype.forEach.call(buttons, function(button) {
+    button.onclick = function() {
+      var url = button.dataset.url + '?after=' + encodeURIComponent(button.dataset.cursor);
+      fetch(url).then(function(response) {
+        return response.json();
+      }).then(function(page) {
+        var row = button.previousElementSibling;
+        page.shows.forEach(function(show) {
+          row.appendChild(showTile(show));
+        });
+        if (page.next_cursor) {
+          button.dataset.cursor = page.next_cursor;
+        } else {
+          button.parentNode.removeChild(button);
+        }
+      });
+    };
+  });
+})();
@@ -2,3 +2,35 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// Name inputs with data-autocomplete suggest matches from that URL and put
+// the id of the chosen one in the input named by data-target.
+document.querySelectorAll('input[data-autocomplete]').forEach(function (input) {
+  var target = document.getElementById(input.dataset.target);
+  var options = document.getElementById(input.getAttribute('list'));
+  var ids = {};
+  var timer;
+
+  input.addEventListener('input', function () {
+    target.value = ids[input.value] || '';
+    clearTimeout(timer);
+    if (target.value || !input.value.trim()) {
+      return;
+    }
+    timer = setTimeout(function () {
+      fetch(input.dataset.autocomplete + '?q=' + encodeURIComponent(input.value.trim()))
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          ids = {};
+          options.innerHTML = '';
+          data.results.forEach(function (result) {
+            var option = document.createElement('option');
+            option.value = result.name + ' (#' + result.id + ')';
+            ids[option.value] = result.id;
+            options.appendChild(option);
+          });
+          target.value = ids[input.value] || '';
+        });
+    }, 150);
+  });
+});
@@ -0,0 +1,158 @@
+from datetime import datetime
+import click
+from flask import Blueprint
+from extensions import cache, db
+from models import Artist, ArtistStats, Show, Venue, VenueStats
+
+# venue_stats and artist_stats hold the upcoming and past show counts of each
+# venue and artist. New shows are added to them as deltas, in the
+# transaction inserting the shows. A deleted venue takes its shows and its
+# row along, and its artists' rows are recomputed without those shows.
+# `flask rollover-stats` recomputes the rows whose next show has started; run
+# it from cron every few minutes, as upcoming counts include started shows
+# until then. `flask rebuild-stats` recomputes every row.
+#
+# A venue or artist without shows may have no row, readers count it as zero.
+
+bp = Blueprint('stats', __name__, cli_group=None)
+
+def stats_of(model):
+  '''The stats model of Venue or Artist, its key and the matching Show column.'''
+  if model is Venue:
+    return VenueStats, VenueStats.venue_id, Show.venue_id
+  return ArtistStats, ArtistStats.artist_id, Show.artist_id
+
+def upsert(stats_model):
+  # Both dialects have INSERT ... ON CONFLICT, SQLAlchemy builds it per dialect
+  if db.engine.dialect.name == 'postgresql':
+    from sqlalchemy.dialects.postgresql import insert
+  else:
+    from sqlalchemy.dialects.sqlite import insert
+  return insert(stats_model.__table__)
+
+def add_shows(shows):
+  '''Counts new shows, given as (venue_id, artist_id, start_time) tuples.
+
+  Concurrent calls for the same venue or artist add up, each delta is
+  applied by a single INSERT ... ON CONFLICT DO UPDATE.
+  '''
+  now = datetime.today()
+  for model, position in ((Venue, 0), (Artist, 1)):
+    stats_model, key, _ = stats_of(model)
+    deltas = {}
+    for show in shows:
+      delta = deltas.setdefault(show[position], {
+        key.name: show[position], 'upcoming_count': 0, 'past_count': 0, 'next_show_at': None, 'last_show_at': None
+      })
+      start_time = show[2]
+      if start_time >= now:
+        delta['upcoming_count'] += 1
+        delta['next_show_at'] = min(filter(None, (delta['next_show_at'], start_time)))
+      else:
+        delta['past_count'] += 1
+        delta['last_show_at'] = max(filter(None, (delta['last_show_at'], start_time)))
+
+    if not deltas:
+      continue
+    statement = upsert(stats_model)
+    current, new = stats_model.__table__.c, statement.excluded
+    db.session.execute(statement.on_conflict_do_update(index_elements=[key.name], set_={
+      'upcoming_count': current.upcoming_count + new.upcoming_count,
+      'past_count': current.past_count + new.past_count,
+      'next_show_at': db.case(
+        (db.or_(current.next_show_at.is_(None), new.next_show_at < current.next_show_at), new.next_show_at),
+        else_=current.next_show_at
+      ),
+      'last_show_at': db.case(
+        (db.or_(current.last_show_at.is_(None), new.last_show_at > current.last_show_at), new.last_show_at),
+        else_=current.last_show_at
+      ),
+    }), list(deltas.values()))
+
+def aggregates(column):
+  '''Stats of every venue or artist with shows, grouped by `column`.'''
+  now = datetime.today()
+  return db.session.query(
+    column,
+    db.func.count(db.case((Show.start_time >= now, 1))),
+    db.func.count(db.case((Show.start_time < now, 1))),
+    db.func.min(db.case((Show.start_time >= now, Show.start_time))),
+    db.func.max(db.case((Show.start_time < now, Show.start_time)))
+  ).group_by(column)
+
+def refresh(model, ids):
+  '''Recomputes the stats of the given venues or artists from their shows.'''
+  ids = list(ids)
+  if not ids:
+    return
+  stats_model, key, column = stats_of(model)
+  columns = [key.name, 'upcoming_count', 'past_count', 'next_show_at', 'last_show_at']
+
+  # Rows of venues or artists left without shows aren't in the aggregates
+  db.session.query(stats_model).filter(key.in_(ids)).update({
+    stats_model.upcoming_count: 0,
+    stats_model.past_count: 0,
+    stats_model.next_show_at: None,
+    stats_model.last_show_at: None,
+  }, synchronize_session=False)
+
+  statement = upsert(stats_model)
+  statement = statement.from_select(columns, aggregates(column).filter(column.in_(ids)).statement)
+  db.session.execute(statement.on_conflict_do_update(
+    index_elements=[key.name],
+    set_={name: statement.excluded[name] for name in columns[1:]}
+  ))
+
+def remove_shows(model, id):
+  '''Deletes the shows of a venue or artist being deleted and recomputes the
+  stats of the artists or venues they were with. Returns the ids of those.'''
+  _, _, column = stats_of(model)
+  other = Artist if model is Venue else Venue
+  _, _, other_column = stats_of(other)
+  ids = [other_id for other_id, in db.session.query(other_column).filter(column == id).distinct()]
+  db.session.query(Show).filter(column == id).delete(synchronize_session=False)
+  refresh(other, ids)
+  return ids
+
+def forget(model, id):
+  '''Drops the stats of a venue or artist being deleted.'''
+  stats_model, key, _ = stats_of(model)
+  db.session.query(stats_model).filter(key == id).delete(synchronize_session=False)
+
+def rollover():
+  '''Recomputes the rows whose next show has started. Returns their number.'''
+  now = datetime.today()
+  refreshed = 0
+  for model in (Venue, Artist):
+    stats_model, key, _ = stats_of(model)
+    ids = [id for id, in db.session.query(key).filter(stats_model.next_show_at < now)]
+    refresh(model, ids)
+    db.session.commit()
+    prefix = 'venue' if model is Venue else 'artist'
+    cache.invalidate(*[f'{prefix}:{id}' for id in ids])
+    refreshed += len(ids)
+  cache.invalidate('venues', 'artists')
+  return refreshed
+
+def rebuild():
+  '''Recomputes every row, in one transaction.'''
+  for model in (Venue, Artist):
+    stats_model, key, column = stats_of(model)
+    db.session.query(stats_model).delete(synchronize_session=False)
+    db.session.execute(stats_model.__table__.insert().from_select(
+      [key.name, 'upcoming_count', 'past_count', 'next_show_at', 'last_show_at'],
+      aggregates(column).statement
+    ))
+  db.session.commit()
+
+@bp.cli.command('rollover-stats')
+def rollover_command():
+  '''Moves shows that have started from the upcoming to the past counts.'''
+  click.echo(f'Refreshed the stats of {rollover()} venues and artists.')
+
+@bp.cli.command('rebuild-stats')
+def rebuild_command():
+  '''Recomputes the show stats of every venue and artist.'''
+  rebuild()
+  cache.invalidate('venues', 'artists', 'shows')
+  click.echo('Rebuilt venue_stats and artist_stats.')
@@ -0,0 +1,33 @@
+import os
+import pytest
+from extensions import db
+import seed
+from tests.conftest import make_app
+
+# Benchmarks share one app whose database is seeded once per session with
+# BENCH_VENUES venues, BENCH_ARTISTS artists and BENCH_SHOWS shows. Point
+# TEST_DATABASE_URL at a PostgreSQL database for numbers comparable with
+# production.
+
+def volume(name, default):
+  return int(os.environ.get(name, default))
+
+@pytest.fixture(scope='session')
+def bench_app():
+  # Every cache entry expires as soon as it is stored, each round runs the view
+  app = make_app({'CACHE_TIMEOUT': 0})
+  with app.app_context():
+    db.create_all()
+    seed.seed(
+      volume('BENCH_VENUES', 100000),
+      volume('BENCH_ARTISTS', 20000),
+      volume('BENCH_SHOWS', 100000)
+    )
+  yield app
+  with app.app_context():
+    db.session.remove()
+    db.drop_all()
+
+@pytest.fixture
+def bench_client(bench_app):
+  return bench_app.test_client()
@@ -0,0 +1,22 @@
+import os
+import pytest
+
+# The browse page with every filter set, results plus facet counts, must
+# answer within BROWSE_BUDGET_MS (median) on the full 100k venue volume.
+
+BROWSE_BUDGET_MS = int(os.environ.get('BROWSE_BUDGET_MS', 50))
+
+@pytest.mark.parametrize('path', ['/venues/browse', '/artists/browse'])
+def test_browse(benchmark, bench_client, path):
+  def request():
+    return bench_client.get(
+      path, query_string={'state': 'NY', 'genre': 'Jazz', 'seeking': 'true'},
+      headers={'Accept': 'application/json'}
+    )
+
+  response = benchmark(request)
+  assert response.status_code == 200
+  assert set(response.json['facets']) == {'state', 'city', 'genre', 'seeking'}
+  # Without timings under --benchmark-disable
+  if not benchmark.disabled:
+    assert benchmark.stats.stats.median * 1000 < BROWSE_BUDGET_MS
@@ -0,0 +1,23 @@
+import random
+import pytest
+from benchmark import scenarios
+
+# One benchmark per controller, the requests of `flask bench`. Save results
+# with --benchmark-json or --benchmark-autosave to compare commits.
+
+@pytest.mark.parametrize('name', [
+  'venues', 'show_venue', 'search_artists', 'shows', 'create_venue', 'create_artist', 'create_show'
+])
+def test_controller(benchmark, bench_app, bench_client, name):
+  with bench_app.app_context():
+    make_request = scenarios(random.Random(0))[name]
+
+  def request():
+    method, path, data = make_request()
+    return bench_client.open(path, method=method, data=data)
+
+  response = benchmark(request)
+  assert response.status_code == 200
+  if name.startswith('create_'):
+    # The handlers answer 200 either way, flashing the outcome
+    assert b'successfully listed' in response.data
@@ -0,0 +1,46 @@
+import resource
+import tracemalloc
+from extensions import db
+from models import Show
+
+# Streaming every show as CSV. Rows per second and the process's peak RSS are
+# reported in extra_info (see --benchmark-json); memory use is checked apart,
+# as the Python heap's high-water mark while streaming against the export's
+# size.
+
+def stream(client, path):
+  '''Reads a streamed export chunk by chunk, returns its lines and bytes.'''
+  response = client.get(path)
+  assert response.status_code == 200
+  lines = size = 0
+  for chunk in response.iter_encoded():
+    lines += chunk.count(b'\n')
+    size += len(chunk)
+  response.close()
+  return lines, size
+
+def test_export_shows(benchmark, bench_app, bench_client):
+  with bench_app.app_context():
+    shows = db.session.query(db.func.count(Show.id)).scalar()
+
+  lines, size = benchmark(stream, bench_client, '/export/shows.csv')
+  # The header line, then one per show
+  assert lines == shows + 1
+
+  if benchmark.disabled:
+    return
+  benchmark.extra_info['rows'] = shows
+  benchmark.extra_info['rows_per_second'] = round(shows / benchmark.stats.stats.median)
+  benchmark.extra_info['bytes'] = size
+  # Kilobytes on Linux, bytes on macOS
+  benchmark.extra_info['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def test_export_memory_is_bounded(bench_app, bench_client):
+  tracemalloc.start()
+  try:
+    lines, size = stream(bench_client, '/export/shows.csv')
+    current, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  # A chunk of EXPORT_CHUNK_SIZE rows is held at a time, never the export
+  assert peak < size / 2
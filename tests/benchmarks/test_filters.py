@@ -0,0 +1,34 @@
+from datetime import datetime
+import babel.dates
+import dateutil.parser
+import pytest
+from filters import DATETIME_FORMATS, format_datetime
+
+# The datetime filter against what it did before: parse str(start_time) back
+# with dateutil and hand babel the format string, which it parses again on
+# every call. Uncached is the precompiled pattern alone, past the memo.
+
+START_TIME = datetime(2035, 4, 1, 20, 30)
+
+def format_parsed(value, format):
+  return babel.dates.format_datetime(dateutil.parser.parse(value), DATETIME_FORMATS[format])
+
+@pytest.mark.parametrize('value', [
+  START_TIME, datetime(2019, 6, 15, 0, 0), datetime(2021, 12, 5, 9, 5), datetime(2024, 2, 29, 12, 45),
+])
+@pytest.mark.parametrize('format', ['full', 'medium'])
+def test_output_matches_babel(value, format):
+  assert format_datetime(value, format) == babel.dates.format_datetime(value, DATETIME_FORMATS[format])
+  assert format_datetime(str(value), format) == format_parsed(str(value), format)
+
+@pytest.mark.benchmark(group='datetime filter')
+def test_parse_and_format(benchmark):
+  assert benchmark(format_parsed, str(START_TIME), 'full') == format_datetime(START_TIME, 'full')
+
+@pytest.mark.benchmark(group='datetime filter')
+def test_cached_pattern_uncached(benchmark):
+  assert benchmark(format_datetime.__wrapped__, START_TIME, 'full') == format_datetime(START_TIME, 'full')
+
+@pytest.mark.benchmark(group='datetime filter')
+def test_cached_pattern_memoized(benchmark):
+  assert benchmark(format_datetime, START_TIME, 'full') == format_parsed(str(START_TIME), 'full')
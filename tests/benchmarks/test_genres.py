@@ -0,0 +1,49 @@
+import pytest
+from enums import GenresEnum, genres_mask
+from extensions import db
+from models import Venue, VenueGenre
+
+# Finding the venues of a genre three ways: a range scan of the venue_genre
+# index, a test of Venue.genres_mask, and the LIKE over ';'-joined genre ids
+# that venues stored before. The joined strings are rebuilt from venue_genre
+# into a scratch table.
+
+GENRE = GenresEnum.Jazz
+
+@pytest.fixture(scope='module')
+def legacy_genres(bench_app):
+  with bench_app.app_context():
+    if db.engine.dialect.name == 'postgresql':
+      joined = "string_agg(CAST(genre AS TEXT), ';')"
+    else:
+      joined = "group_concat(genre, ';')"
+    db.session.execute(db.text(
+      f'CREATE TABLE legacy_venue_genres AS '
+      f'SELECT venue_id, {joined} AS genres FROM venue_genre GROUP BY venue_id'
+    ))
+    db.session.commit()
+  yield
+  with bench_app.app_context():
+    db.session.execute(db.text('DROP TABLE legacy_venue_genres'))
+    db.session.commit()
+
+def count_indexed():
+  return db.session.query(db.func.count()).select_from(VenueGenre) \
+    .filter(VenueGenre.genre == GENRE.value).scalar()
+
+def count_masked():
+  return db.session.query(db.func.count()).select_from(Venue) \
+    .filter(Venue.genres_mask.op('&')(genres_mask([GENRE])) != 0).scalar()
+
+def count_joined():
+  return db.session.execute(db.text(
+    "SELECT count(*) FROM legacy_venue_genres WHERE (';' || genres || ';') LIKE :pattern"
+  ), {'pattern': f'%;{GENRE.value};%'}).scalar()
+
+@pytest.mark.benchmark(group='genre filter')
+@pytest.mark.parametrize('count', [count_indexed, count_masked, count_joined], ids=lambda count: count.__name__)
+def test_genre_filter(benchmark, bench_app, legacy_genres, count):
+  with bench_app.app_context():
+    expected = count_indexed()
+    assert expected > 0
+    assert benchmark(count) == expected
@@ -0,0 +1,33 @@
+import json
+import random
+import seed
+
+# Bulk import throughput: RECORDS venue records posted as NDJSON to a fresh
+# database, validated with VenueForm and inserted a batch at a time. Rows per
+# second go to extra_info.
+
+RECORDS = 5000
+
+def venue_records(count):
+  rng = random.Random(0)
+  places = seed.cities(rng)
+  for row in seed.venue_rows(rng, count, places, None):
+    record = {name: value for name, value in row.items() if name != 'updated_at'}
+    record['genres'] = ';'.join(str(genre) for genre in rng.sample(range(1, 20), 2))
+    if rng.random() < 0.5:
+      # Optional fields left blank, and free text where a form has it
+      record.update(website='', facebook_link='', seeking_description='Looking for jazz trios on weekends')
+    yield record
+
+def test_import_venues(benchmark, app, client):
+  body = '\n'.join(json.dumps(record) for record in venue_records(RECORDS))
+
+  def post():
+    return client.post('/api/v1/import/venues', data=body, content_type='application/x-ndjson')
+
+  response = benchmark.pedantic(post, rounds=3)
+  assert response.json['errors'] == []
+  assert response.json['imported'] == RECORDS
+
+  if not benchmark.disabled:
+    benchmark.extra_info['rows_per_second'] = round(RECORDS / benchmark.stats.stats.median)
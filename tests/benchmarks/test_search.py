@@ -0,0 +1,11 @@
+import pytest
+
+# A page of venue search results out of the full 100k venues: a common word,
+# a rare phrase, and a term too short for the trigram indexes.
+
+@pytest.mark.benchmark(group='search')
+@pytest.mark.parametrize('q', ['lantern', 'velvet owl hall', 'ow'])
+def test_search_venues(benchmark, bench_client, q):
+  response = benchmark(bench_client.get, '/api/v1/venues/search', query_string={'q': q})
+  assert response.status_code == 200
+  assert response.json['data']
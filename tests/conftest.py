@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import event
+from app import create_app
+from config import TestingConfig
+from extensions import db
+
+# Each test gets an app on TestingConfig with its own in-memory SQLite
+# database (or TEST_DATABASE_URL), tables created. Tests needing other
+# settings override the `settings` fixture.
+
+def make_app(settings):
+  return create_app(type('Config', (TestingConfig,), dict(settings)))
+
+@pytest.fixture
+def settings():
+  '''Config values overriding TestingConfig.'''
+  return {}
+
+@pytest.fixture
+def app(settings):
+  app = make_app(settings)
+  with app.app_context():
+    db.create_all()
+    yield app
+    db.session.remove()
+    db.drop_all()
+
+@pytest.fixture
+def client(app):
+  return app.test_client()
+
+@pytest.fixture
+def statements(app):
+  '''The SQL statements run on the primary engine, in order.'''
+  executed = []
+
+  def record(conn, cursor, statement, parameters, context, executemany):
+    executed.append(statement)
+
+  event.listen(db.engine, 'after_cursor_execute', record)
+  yield executed
+  event.remove(db.engine, 'after_cursor_execute', record)
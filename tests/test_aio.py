@@ -0,0 +1,59 @@
+import re
+import pytest
+from sqlalchemy.pool import NullPool
+import aio
+from extensions import db
+from tests.test_routing import add_venue, venue_name
+
+pytest.importorskip('aiosqlite')
+
+# aio.fetch_all() on aiosqlite engines of a primary and a replica file, which
+# hold different names for the same venue like in test_routing.py. NullPool,
+# as each fetch_all() outside an ASGI server runs on an event loop of its own.
+
+@pytest.fixture
+def settings(tmp_path):
+  return {
+    'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/primary.db',
+    'SQLALCHEMY_REPLICA_URIS': [f'sqlite:///{tmp_path}/replica.db'],
+    'SQLALCHEMY_ASYNC_DATABASE_URI': f'sqlite+aiosqlite:///{tmp_path}/primary.db',
+    'SQLALCHEMY_ASYNC_REPLICA_URIS': [f'sqlite+aiosqlite:///{tmp_path}/replica.db'],
+    'SQLALCHEMY_ASYNC_ENGINE_OPTIONS': {'poolclass': NullPool},
+    'CACHE_TIMEOUT': 0,
+    'SLOW_QUERY_MS': 0,
+  }
+
+@pytest.fixture
+def replica(app):
+  aio.init_app(app)
+  engine = app.extensions['replicas'].engines[0]
+  db.metadata.create_all(engine)
+  with db.engine.begin() as connection:
+    add_venue(connection, 'Primary Hall')
+  with engine.begin() as connection:
+    add_venue(connection, 'Replica Hall')
+  yield engine
+  db.metadata.drop_all(engine)
+
+def test_async_reads_use_the_replica(client, replica):
+  assert venue_name(client) == 'Replica Hall'
+
+def test_async_reads_stick_to_the_primary_after_a_write(client, replica):
+  client.post('/venues/create', data={'name': 'New Hall', 'city': 'Springfield', 'state': '1'})
+  assert venue_name(client) == 'Primary Hall'
+
+def test_async_statements_are_counted_and_explained(client, replica, caplog):
+  response = client.get('/api/v1/venues/1')
+  assert response.status_code == 200
+
+  # The venue row and its two pages of shows
+  queries = int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+  assert queries >= 3
+  slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow query')]
+  assert len(slow) == queries
+  assert not any('EXPLAIN failed' in message for message in slow)
+
+def test_async_replicas_must_match_the_replicas(app):
+  app.config['SQLALCHEMY_ASYNC_REPLICA_URIS'] = []
+  with pytest.raises(ValueError):
+    aio.init_app(app)
@@ -0,0 +1,79 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import pytest
+import assets
+
+# `flask assets build` into a copy of static/, so the tree's static/dist is
+# left alone; the app is then pointed at the copy, as if built before start.
+
+@pytest.fixture
+def built(app, tmp_path):
+  static_folder = tmp_path / 'static'
+  shutil.copytree(app.static_folder, static_folder, ignore=shutil.ignore_patterns(assets.DIST))
+  result = assets.build(str(static_folder))
+  app.static_folder = str(static_folder)
+  app.extensions['assets_manifest'] = assets.load_manifest(app)
+  return static_folder / assets.DIST, result
+
+def read(path):
+  with open(path, 'rb') as file:
+    return file.read()
+
+def test_bundles_are_fingerprinted_by_content(built):
+  dist, result = built
+  manifest = json.loads(read(dist / 'manifest.json'))
+  assert manifest == {name: filename for name, (filename, sizes) in result.items()}
+  for name, filename in manifest.items():
+    content = read(dist / filename)
+    stem, extension = os.path.splitext(os.path.basename(name))
+    assert filename == f'{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}'
+
+def test_compressed_copies_match_the_bundles(built):
+  dist, result = built
+  for name in assets.BUNDLES:
+    filename, sizes = result[name]
+    content = read(dist / filename)
+    assert gzip.decompress(read(dist / (filename + '.gz'))) == content
+    assert sizes['raw'] == len(content)
+  # Images are already compressed
+  assert not os.path.exists(dist / (result['img/front-splash.jpg'][0] + '.gz'))
+
+def test_brotli_copies_match_the_bundles(built):
+  brotli = pytest.importorskip('brotli')
+  dist, result = built
+  for name in assets.BUNDLES:
+    filename, sizes = result[name]
+    assert brotli.decompress(read(dist / (filename + '.br'))) == read(dist / filename)
+
+def test_pages_link_the_fingerprinted_bundles(client, built):
+  dist, result = built
+  html = client.get('/').get_data(as_text=True)
+  for name in assets.BUNDLES:
+    assert f'/static/dist/{result[name][0]}' in html
+  assert '/static/css/main.css' not in html
+  assert '/static/js/script.js' not in html
+
+def test_pages_link_the_sources_without_a_build(client):
+  html = client.get('/').get_data(as_text=True)
+  assert '/static/css/main.css' in html
+  assert '/static/dist/' not in html
+
+@pytest.mark.parametrize('accept, encoding, suffix', [
+  ('br, gzip', 'br', '.br'), ('gzip', 'gzip', '.gz'), ('', None, ''),
+])
+def test_dist_files_are_served_precompressed_and_immutable(client, built, accept, encoding, suffix):
+  if encoding == 'br':
+    pytest.importorskip('brotli')
+  dist, result = built
+  filename = result['main.css'][0]
+  response = client.get(f'/static/dist/{filename}', headers={'Accept-Encoding': accept})
+  assert response.status_code == 200
+  assert response.headers.get('Content-Encoding') == encoding
+  assert response.mimetype == 'text/css'
+  assert response.data == read(dist / (filename + suffix))
+  assert 'immutable' in response.headers['Cache-Control']
+  assert 'Accept-Encoding' in response.headers['Vary']
+  response.close()
@@ -0,0 +1,57 @@
+import pytest
+from extensions import db
+from models import Artist, Venue
+
+# Browse pages filter on state, city, genre and seeking and count each facet.
+# Venues from before state and city were required have them blank, artists
+# may have them NULL; both are listed but get no facet value.
+
+@pytest.fixture
+def profiles(app):
+  db.session.add_all([
+    Venue(name='Jazz Hall', city='San Francisco', state='5', genres=[11], seeking_talent=True),
+    Venue(name='Blues Bar', city='Oakland', state='5', genres=[2], seeking_talent=False),
+    Venue(name='Old Hall', city='', state='', genres=[11], seeking_talent=False),
+    Artist(name='Quartet', city='New York', state='27', genres=[11], seeking_venue=True),
+    Artist(name='Nomad', city=None, state=None, genres=[11], seeking_venue=False),
+  ])
+  db.session.commit()
+
+def browse(client, path, **filters):
+  response = client.get(path, query_string=filters, headers={'Accept': 'application/json'})
+  assert response.status_code == 200
+  return response.json
+
+def facet(data, name):
+  return {item['value']: item['count'] for item in data['facets'][name]}
+
+def test_browse_lists_venues_without_a_state(client, profiles):
+  data = browse(client, '/venues/browse')
+  assert sorted(result['name'] for result in data['results']) == ['Blues Bar', 'Jazz Hall', 'Old Hall']
+  assert {result['name']: result['state'] for result in data['results']}['Old Hall'] is None
+  assert facet(data, 'state') == {'CA': 2}
+  assert facet(data, 'genre') == {'Jazz': 2, 'Blues': 1}
+
+def test_browse_filters_and_counts_facets(client, profiles):
+  data = browse(client, '/venues/browse', state='CA', genre='Jazz')
+  assert [result['name'] for result in data['results']] == ['Jazz Hall']
+  # Each facet is counted with the other filters
+  assert facet(data, 'state') == {'CA': 1}
+  assert facet(data, 'genre') == {'Jazz': 1, 'Blues': 1}
+  assert facet(data, 'city') == {'San Francisco': 1}
+  assert facet(data, 'seeking') == {'true': 1}
+
+def test_browse_lists_artists_without_a_state(client, profiles):
+  data = browse(client, '/artists/browse', genre='Jazz')
+  assert sorted(result['name'] for result in data['results']) == ['Nomad', 'Quartet']
+  assert facet(data, 'state') == {'NY': 1}
+  assert facet(data, 'seeking') == {'true': 1, 'false': 1}
+
+@pytest.mark.parametrize('path', ['/venues/browse', '/artists/browse', '/venues/browse?state=CA'])
+def test_browse_page_renders_blank_states(client, profiles, path):
+  response = client.get(path)
+  assert response.status_code == 200
+  assert b'None' not in response.data
+
+def test_browse_rejects_unknown_values(client, profiles):
+  assert client.get('/venues/browse', query_string={'state': 'XX'}).status_code == 400
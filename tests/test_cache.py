@@ -0,0 +1,81 @@
+import pytest
+import seed
+from extensions import cache
+
+# Cached pages are served again until a write bumps the generation of a
+# namespace they were built from: creating, editing or booking a show for a
+# venue or artist drops exactly the pages showing it.
+
+PROFILE = {'name': 'New Hall', 'city': 'Springfield', 'state': '1', 'address': '1 Main St', 'genres': ['1']}
+
+@pytest.fixture
+def profiles(app):
+  seed.seed(2, 2, 0)
+
+def get(client, path):
+  response = client.get(path)
+  assert response.status_code == 200
+  return response.headers['X-Cache']
+
+def generations(*namespaces):
+  return cache.backend.generations(namespaces)
+
+def post(client, path, data):
+  # Following the redirect consumes the flashed message, pages carrying one
+  # are never cached
+  response = client.post(path, data=data, follow_redirects=True)
+  assert response.status_code == 200
+  assert b'was successfully listed' in response.data or b'was updated' in response.data
+
+def bumped(before, after):
+  return {namespace for namespace in before if after[namespace] != before[namespace]}
+
+NAMESPACES = ['venues', 'artists', 'shows', 'venue:1', 'venue:2', 'artist:1', 'artist:2']
+
+def snapshot():
+  return dict(zip(NAMESPACES, generations(*NAMESPACES)))
+
+def test_cached_pages_are_served_again(client, profiles):
+  for path in ['/venues', '/venues/1', '/artists', '/artists/1', '/shows']:
+    assert get(client, path) == 'MISS'
+    assert get(client, path) == 'HIT'
+
+def test_creating_a_venue_drops_the_venues_listing(client, profiles):
+  get(client, '/venues')
+  get(client, '/venues/1')
+  before = snapshot()
+  post(client, '/venues/create', PROFILE)
+  assert bumped(before, snapshot()) == {'venues'}
+
+  assert get(client, '/venues') == 'MISS'
+  assert b'New Hall' in client.get('/venues').data
+  assert get(client, '/venues/1') == 'HIT'
+
+def test_creating_an_artist_drops_the_artists_listing(client, profiles):
+  before = snapshot()
+  post(client, '/artists/create', dict(PROFILE, name='New Band'))
+  assert bumped(before, snapshot()) == {'artists'}
+
+def test_new_shows_drop_both_ends_and_the_listings(client, profiles):
+  get(client, '/venues/2')
+  before = snapshot()
+  post(client, '/shows/create', {'venue_id': '1', 'artist_id': '2', 'start_time': '2099-05-01 20:00:00'})
+  assert bumped(before, snapshot()) == {'venues', 'artists', 'shows', 'venue:1', 'artist:2'}
+  assert get(client, '/venues/2') == 'HIT'
+
+def test_editing_a_venue_drops_the_pages_of_its_artists(client, profiles):
+  post(client, '/shows/create', {'venue_id': '1', 'artist_id': '2', 'start_time': '2099-05-01 20:00:00'})
+  get(client, '/artists/2')
+  before = snapshot()
+  post(client, '/venues/1/edit', dict(PROFILE, name='Renamed Hall'))
+  assert bumped(before, snapshot()) == {'venues', 'shows', 'venue:1', 'artist:2'}
+
+  assert get(client, '/artists/2') == 'MISS'
+  assert b'Renamed Hall' in client.get('/artists/2').data
+
+def test_editing_an_artist_drops_the_pages_of_its_venues(client, profiles):
+  post(client, '/shows/create', {'venue_id': '2', 'artist_id': '1', 'start_time': '2099-05-01 20:00:00'})
+  before = snapshot()
+  post(client, '/artists/1/edit', dict(PROFILE, name='Renamed Band'))
+  assert bumped(before, snapshot()) == {'artists', 'shows', 'artist:1', 'venue:2'}
+  assert b'Renamed Band' in client.get('/venues/2').data
@@ -0,0 +1,47 @@
+import pytest
+import seed
+
+# The venue, artist and shows pages answer a matching If-None-Match or a
+# recent enough If-Modified-Since with an empty 304, and a new show changes
+# the ETag of every page listing it.
+
+@pytest.fixture
+def profiles(app):
+  seed.seed(2, 2, 0)
+
+PAGES = ['/venues/1', '/artists/2', '/shows']
+
+def create_show(client):
+  response = client.post('/shows/create', data={
+    'venue_id': '1', 'artist_id': '2', 'start_time': '2099-05-01 20:00:00'
+  }, follow_redirects=True)
+  assert b'was successfully listed' in response.data
+
+@pytest.mark.parametrize('path', PAGES)
+def test_matching_etag_is_not_modified(client, profiles, path):
+  response = client.get(path)
+  assert response.status_code == 200
+  etag = response.headers['ETag']
+
+  response = client.get(path, headers={'If-None-Match': etag})
+  assert response.status_code == 304
+  assert response.data == b''
+  assert response.headers['ETag'] == etag
+
+  assert client.get(path, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+@pytest.mark.parametrize('path', PAGES)
+def test_if_modified_since_last_modified_is_not_modified(client, profiles, path):
+  last_modified = client.get(path).headers['Last-Modified']
+  assert client.get(path, headers={'If-Modified-Since': last_modified}).status_code == 304
+  assert client.get(path, headers={'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'}).status_code == 200
+
+@pytest.mark.parametrize('path', PAGES)
+def test_new_show_changes_the_etag(client, profiles, path):
+  etag = client.get(path).headers['ETag']
+  create_show(client)
+
+  response = client.get(path, headers={'If-None-Match': etag})
+  assert response.status_code == 200
+  assert response.headers['ETag'] != etag
+  assert client.get(path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
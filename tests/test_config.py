@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+from tests.test_startup import ROOT
+
+# Settings are read from the environment when config.py is imported, so each
+# case builds the app in a fresh interpreter with its own environment.
+
+def app_config(tmp_path, **environ):
+  '''The config of create_app() under `environ`, with the engine options.
+
+  Runs in `tmp_path`, where apps outside debug mode write their error.log.
+  '''
+  env = {name: value for name, value in os.environ.items() if name not in ('FYYUR_CONFIG', 'DEBUG')}
+  env.update(environ, PYTHONPATH=ROOT)
+  output = subprocess.run([sys.executable, '-c', '''
+import json
+from app import create_app
+app = create_app()
+options = dict(app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+options['poolclass'] = options['poolclass'].__name__ if 'poolclass' in options else None
+print(json.dumps({'TESTING': app.config['TESTING'], 'DEBUG': app.config['DEBUG'], 'options': options}))
+'''], cwd=tmp_path, env=env, capture_output=True, text=True, check=True).stdout
+  return json.loads(output)
+
+def test_pool_settings_come_from_the_environment(tmp_path):
+  config = app_config(
+    tmp_path, FYYUR_CONFIG='production', SECRET_KEY='secret', DATABASE_URL=f'sqlite:///{tmp_path}/fyyur.db',
+    DB_POOL_SIZE='7', DB_MAX_OVERFLOW='3', DB_POOL_TIMEOUT='4', DB_POOL_RECYCLE='60', DB_STATEMENT_TIMEOUT='1500',
+  )
+  assert config['options'] == {
+    'pool_size': 7,
+    'max_overflow': 3,
+    'pool_timeout': 4,
+    'pool_recycle': 60,
+    'pool_pre_ping': True,
+    'connect_args': {'options': '-c statement_timeout=1500'},
+    'poolclass': 'TimedQueuePool',
+  }
+  assert config['TESTING'] is False
+  assert config['DEBUG'] is False
+
+def test_pool_settings_default(tmp_path):
+  config = app_config(tmp_path, FYYUR_CONFIG='production', SECRET_KEY='secret', DATABASE_URL=f'sqlite:///{tmp_path}/fyyur.db')
+  assert (config['options']['pool_size'], config['options']['max_overflow']) == (5, 5)
+  assert config['options']['connect_args'] == {'options': '-c statement_timeout=30000'}
+
+def test_fyyur_config_picks_the_config_class(tmp_path):
+  assert app_config(tmp_path, FYYUR_CONFIG='testing')['TESTING'] is True
+  development = app_config(tmp_path, DATABASE_URL=f'sqlite:///{tmp_path}/fyyur.db')
+  assert (development['TESTING'], development['DEBUG']) == (False, True)
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+import pytest
+import seed
+from extensions import db
+from models import Artist, Venue
+
+# Venue and artist exports carry their genres decoded, as the genre ids the
+# import takes, and import back as they are.
+
+@pytest.fixture
+def profiles(app):
+  seed.seed(3, 3, 5)
+
+def export(client, path):
+  response = client.get(path)
+  assert response.status_code == 200
+  return response.get_data(as_text=True)
+
+@pytest.mark.parametrize('kind, model', [('venues', Venue), ('artists', Artist)])
+def test_ndjson_exports_decode_genres(client, profiles, kind, model):
+  records = [json.loads(line) for line in export(client, f'/export/{kind}.ndjson').splitlines()]
+  assert [record['id'] for record in records] == [profile.id for profile in model.query.order_by(model.id)]
+  for record in records:
+    assert 'genres_mask' not in record and 'updated_at' not in record
+    assert record['genres'] == [genre.value for genre in db.session.get(model, record['id']).genres]
+    assert record['genres']
+
+def test_csv_exports_join_genres(client, profiles):
+  rows = list(csv.DictReader(io.StringIO(export(client, '/export/venues.csv'))))
+  assert 'genres_mask' not in rows[0] and 'updated_at' not in rows[0]
+  for row in rows:
+    assert row['genres'] == ';'.join(str(genre.value) for genre in db.session.get(Venue, int(row['id'])).genres)
+
+@pytest.mark.parametrize('kind, model', [('venues', Venue), ('artists', Artist)])
+def test_exports_import_back(client, profiles, kind, model):
+  body = export(client, f'/export/{kind}.ndjson')
+  response = client.post(f'/api/v1/import/{kind}', data=body, content_type='application/x-ndjson')
+  assert response.json['errors'] == []
+  assert response.json['imported'] == 3
+  profiles = model.query.order_by(model.id).all()
+  assert [profile.genres for profile in profiles[3:]] == [profile.genres for profile in profiles[:3]]
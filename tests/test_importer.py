@@ -0,0 +1,78 @@
+import json
+import pytest
+from extensions import db
+from models import Artist, Show, Venue
+import seed
+
+# Imports run each record through the form of the matching create page and
+# report the rows it rejects.
+
+@pytest.fixture
+def profiles(app):
+  seed.seed(2, 2, 0)
+
+def post_import(client, kind, lines):
+  response = client.post(f'/api/v1/import/{kind}', data='\n'.join(lines), content_type='application/x-ndjson')
+  assert response.status_code == 200
+  return response.json
+
+def import_shows(client, *records):
+  return post_import(client, 'shows', [json.dumps(record) for record in records])
+
+# As exported from a listings site: links and phone often missing, the
+# seeking description is prose. States and genres are the form's choice ids.
+VENUE = {
+  'name': 'The Velvet Cellar', 'city': 'Brooklyn', 'state': '27', 'address': '12 Main St',
+  'phone': '', 'image_link': '', 'facebook_link': None, 'website': 'https://velvetcellar.example.com',
+  'genres': '11;2', 'seeking_talent': True,
+  'seeking_description': 'Looking for quartets for our Sunday brunch residency.',
+}
+ARTIST = {
+  'name': 'Ada Brooks', 'city': 'Austin', 'state': '44', 'phone': '512555019',
+  'image_link': '', 'facebook_link': '', 'website': '',
+  'genres': [6], 'seeking_venue': False, 'seeking_description': 'Touring the south in May.',
+}
+
+def test_shows_are_imported(client, profiles):
+  result = import_shows(client, {'venue_id': 1, 'artist_id': 2, 'start_time': '2099-05-01 20:00:00'})
+  assert result['imported'] == 1
+  assert result['errors'] == []
+  assert db.session.query(Show.start_time).scalar().year == 2099
+
+@pytest.mark.parametrize('start_time', [None, ''])
+def test_shows_without_a_start_time_are_rejected(client, profiles, start_time):
+  record = {'venue_id': 1, 'artist_id': 2}
+  if start_time is not None:
+    record['start_time'] = start_time
+  result = import_shows(client, record)
+  assert result['imported'] == 0
+  assert [error['row'] for error in result['errors']] == [1]
+  assert 'start_time' in result['errors'][0]['errors']
+  assert Show.query.count() == 0
+
+def test_venues_are_imported(client, app):
+  result = post_import(client, 'venues', [json.dumps(VENUE)])
+  assert result == {'imported': 1, 'errors': [], 'position': 1}
+  venue = Venue.query.one()
+  assert venue.seeking_description == VENUE['seeking_description']
+  assert sorted(genre.name for genre in venue.genres) == ['Blues', 'Jazz']
+
+def test_artists_are_imported(client, app):
+  result = post_import(client, 'artists', [json.dumps(ARTIST)])
+  assert result['imported'] == 1
+  assert result['errors'] == []
+  artist = Artist.query.one()
+  assert (artist.name, artist.phone, artist.seeking_description) == ('Ada Brooks', '512555019', 'Touring the south in May.')
+
+def test_malformed_lines_are_row_errors(client, app):
+  second = dict(VENUE, name='The Silent Owl Club')
+  result = post_import(client, 'venues', [json.dumps(VENUE), '{"name": "The Broken', '[1, 2]', json.dumps(second)])
+  assert result['imported'] == 2
+  assert [(error['row'], list(error['errors'])) for error in result['errors']] == [(2, ['record']), (3, ['record'])]
+  assert Venue.query.count() == 2
+
+def test_batches_without_valid_rows_insert_nothing(client, app):
+  result = post_import(client, 'artists', [json.dumps(dict(ARTIST, name='')), 'null'])
+  assert result['imported'] == 0
+  assert [error['row'] for error in result['errors']] == [1, 2]
+  assert Artist.query.count() == 0
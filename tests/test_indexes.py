@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from extensions import db
+from models import Artist, Venue
+from pagination import encode_cursor
+from queries import artist_shows_query, shows_page_query, venue_shows_query, venues_page_query
+import seed
+
+# The show queries of the detail pages must be answered from the
+# (venue_id, start_time) and (artist_id, start_time) indexes, the /venues
+# pages from the (state, city, id) index.
+
+def query_plan(query):
+  '''EXPLAIN output of a query, one line per plan row.'''
+  compiled = query.statement.compile(dialect=db.engine.dialect)
+  connection = db.session.connection()
+  if db.engine.dialect.name == 'sqlite':
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), parameters)
+  else:
+    # The test tables are small enough that PostgreSQL would rather scan them
+    connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    rows = connection.exec_driver_sql('EXPLAIN ' + str(compiled), compiled.params)
+  return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+@pytest.fixture(autouse=True)
+def shows(app):
+  seed.seed(20, 20, 500)
+
+@pytest.mark.parametrize('when', ['upcoming', 'past'])
+def test_venue_shows_use_the_venue_index(when):
+  plan = query_plan(shows_page_query(venue_shows_query(1), when))
+  assert 'ix_show_venue_id_start_time' in plan
+
+@pytest.mark.parametrize('when', ['upcoming', 'past'])
+def test_artist_shows_use_the_artist_index(when):
+  plan = query_plan(shows_page_query(artist_shows_query(1), when))
+  assert 'ix_show_artist_id_start_time' in plan
+
+@pytest.mark.parametrize('cursor', [None, encode_cursor(['27', 'Springfield', 10])])
+def test_venue_pages_use_the_area_index(cursor):
+  assert 'ix_venue_state_city_id' in query_plan(venues_page_query(cursor))
+
+@pytest.mark.parametrize('model', [Venue, Artist])
+def test_trigram_indexes_are_declared_for_postgresql(model):
+  indexes = {index.name: index for index in model.__table__.indexes if index.name.endswith('_trgm')}
+  prefix = model.__tablename__.lower()
+  assert sorted(indexes) == [f'ix_{prefix}_city_trgm', f'ix_{prefix}_name_trgm']
+  ddl = str(CreateIndex(indexes[f'ix_{prefix}_name_trgm']).compile(dialect=postgresql.dialect()))
+  assert f'ON "{model.__tablename__}" USING gin (name gin_trgm_ops)' in ddl
+
+  created = {index['name'] for index in inspect(db.engine).get_indexes(model.__tablename__)}
+  assert (set(indexes) <= created) == (db.engine.dialect.name == 'postgresql')
+
+@pytest.mark.parametrize('model', [Venue, Artist])
+def test_name_prefix_index_is_declared_for_postgresql(model):
+  name = f'ix_{model.__tablename__.lower()}_name_prefix'
+  index = next(index for index in model.__table__.indexes if index.name == name)
+  ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+  assert ddl.endswith(f'ON "{model.__tablename__}" (lower(name) COLLATE "C")')
+
+  created = {index['name'] for index in inspect(db.engine).get_indexes(model.__tablename__)}
+  assert (name in created) == (db.engine.dialect.name == 'postgresql')
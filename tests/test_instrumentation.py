@@ -0,0 +1,29 @@
+import pytest
+from extensions import db
+from instrumentation import explain
+from models import Venue
+
+# Statements slower than SLOW_QUERY_MS are logged with their plan, read in a
+# savepoint of the request's own transaction.
+
+@pytest.fixture
+def settings():
+  return {'SLOW_QUERY_MS': 0, 'CACHE_TIMEOUT': 0}
+
+def test_slow_queries_are_logged_with_their_plan(client, caplog):
+  assert client.get('/venues').status_code == 200
+  slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow query')]
+  assert slow
+  assert not any('EXPLAIN failed' in message for message in slow)
+
+def test_failed_explain_leaves_the_transaction_usable(app):
+  db.session.add(Venue(name='Pending Hall', city='Springfield', state='1'))
+  db.session.flush()
+
+  plan = explain(db.session.connection(), 'SELECT * FROM no_such_table', ())
+  assert plan.startswith('EXPLAIN failed')
+
+  # The pending insert is still there and commits
+  assert Venue.query.filter_by(name='Pending Hall').count() == 1
+  db.session.commit()
+  assert Venue.query.filter_by(name='Pending Hall').count() == 1
@@ -0,0 +1,59 @@
+import re
+import pytest
+from tests.conftest import make_app
+
+# /metrics after a few requests: request counters and latency histograms per
+# endpoint, error counts and the pool gauges. Each app counts its own.
+
+@pytest.fixture
+def settings(tmp_path):
+  # A file database, so the engine gets a timed QueuePool
+  return {
+    'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/metrics.db',
+    'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 2, 'max_overflow': 1},
+  }
+
+def scrape(client):
+  response = client.get('/metrics')
+  assert response.status_code == 200
+  assert response.mimetype == 'text/plain'
+  return response.get_data(as_text=True).splitlines()
+
+def value(lines, series):
+  matches = [line.rsplit(' ', 1)[1] for line in lines if line.rsplit(' ', 1)[0] == series]
+  assert len(matches) == 1, series
+  return float(matches[0])
+
+def test_metrics_after_requests(client):
+  for _ in range(2):
+    assert client.get('/venues').status_code == 200
+  assert client.get('/no-such-page').status_code == 404
+  lines = scrape(client)
+
+  assert '# TYPE http_requests_total counter' in lines
+  assert value(lines, 'http_requests_total{endpoint="venues.venues",method="GET",status="200"}') == 2
+  assert value(lines, 'http_errors_total{status="404"}') == 1
+
+  assert '# TYPE http_request_duration_seconds histogram' in lines
+  buckets = [
+    float(count) for le, count in
+    re.findall(r'^http_request_duration_seconds_bucket\{endpoint="venues\.venues",le="([^"]+)"\} (\S+)$', '\n'.join(lines), re.M)
+  ]
+  assert len(buckets) == 12
+  assert buckets == sorted(buckets)
+  assert buckets[-1] == 2
+  assert value(lines, 'http_request_duration_seconds_count{endpoint="venues.venues"}') == 2
+  assert value(lines, 'http_request_duration_seconds_sum{endpoint="venues.venues"}') > 0
+  # The second /venues came from the response cache
+  assert value(lines, 'template_render_duration_seconds_count{template="pages/venues.html"}') == 1
+
+  assert value(lines, 'db_pool_max_connections{pool="primary"}') == 3
+  assert 0 <= value(lines, 'db_pool_checked_out{pool="primary"}') <= 3
+  assert value(lines, 'db_pool_checkout_wait_seconds_count') >= 2
+  assert value(lines, 'http_requests_in_flight') == 1
+
+def test_each_app_counts_its_own_requests(client, settings):
+  client.get('/venues')
+  other = make_app(settings).test_client()
+  assert not any(line.startswith('http_requests_total{endpoint="venues.venues"') for line in scrape(other))
+  assert value(scrape(client), 'http_requests_total{endpoint="venues.venues",method="GET",status="200"}') == 1
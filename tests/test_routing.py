@@ -0,0 +1,77 @@
+import time
+from datetime import datetime
+import pytest
+from extensions import db
+from models import Venue
+
+# A primary and a replica as two SQLite files, holding a different name for
+# the same venue so each read shows which database answered it.
+
+@pytest.fixture
+def settings(tmp_path):
+  return {
+    'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/primary.db',
+    'SQLALCHEMY_REPLICA_URIS': [f'sqlite:///{tmp_path}/replica.db'],
+    'CACHE_TIMEOUT': 0,
+  }
+
+def add_venue(connection, name):
+  connection.execute(Venue.__table__.insert(), {
+    'id': 1, 'name': name, 'city': 'Springfield', 'state': '1', 'updated_at': datetime.utcnow(), 'genres_mask': 0
+  })
+
+@pytest.fixture
+def replica(app):
+  engine = app.extensions['replicas'].engines[0]
+  db.metadata.create_all(engine)
+  with db.engine.begin() as connection:
+    add_venue(connection, 'Primary Hall')
+  with engine.begin() as connection:
+    add_venue(connection, 'Replica Hall')
+  yield engine
+  db.metadata.drop_all(engine)
+
+def venue_name(client):
+  return client.get('/api/v1/venues/1').get_json()['data']['name']
+
+def test_get_reads_from_the_replica(client, replica):
+  assert venue_name(client) == 'Replica Hall'
+
+def test_writes_go_to_the_primary_and_stick(client, replica):
+  assert venue_name(client) == 'Replica Hall'
+  response = client.post('/venues/create', data={
+    'name': 'New Hall', 'city': 'Springfield', 'state': '1', 'address': '1 Main St', 'genres': ['1']
+  })
+  assert b'successfully listed' in response.data
+
+  assert db.session.query(Venue.name).filter(Venue.name == 'New Hall').count() == 1
+  with replica.connect() as connection:
+    assert connection.execute(db.select(Venue.name).filter(Venue.name == 'New Hall')).first() is None
+  # The client reads its own write from the primary
+  assert venue_name(client) == 'Primary Hall'
+
+def test_reads_after_the_sticky_period_use_the_replica(app, client, replica, monkeypatch):
+  client.post('/venues/create', data={'name': 'New Hall'})
+  later = time.time() + app.config['READ_AFTER_WRITE_SECONDS'] + 1
+  monkeypatch.setattr(time, 'time', lambda: later)
+  assert venue_name(client) == 'Replica Hall'
+
+@pytest.mark.parametrize('path', ['/venues/search', '/artists/search'])
+def test_search_posts_read_from_the_replica_and_dont_stick(client, replica, path):
+  response = client.post(path, data={'search_term': 'hall'})
+  assert response.status_code == 200
+  if path == '/venues/search':
+    assert b'Replica Hall' in response.data
+  with client.session_transaction() as session:
+    assert 'primary_until' not in session
+  assert venue_name(client) == 'Replica Hall'
+
+@pytest.mark.parametrize('settings', [{
+  'SQLALCHEMY_REPLICA_URIS': ['sqlite:////nonexistent/replica.db'],
+  'CACHE_TIMEOUT': 0,
+}])
+def test_unhealthy_replica_falls_back_to_the_primary(client):
+  client.post('/venues/create', data={'name': 'Primary Hall', 'city': 'Springfield', 'state': '1', 'address': '1 Main St', 'genres': ['1']})
+  with client.session_transaction() as session:
+    session.pop('primary_until', None)
+  assert venue_name(client) == 'Primary Hall'
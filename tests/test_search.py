@@ -0,0 +1,114 @@
+import re
+import pytest
+from extensions import db
+from models import Artist, Venue
+
+# The search endpoints return keyset pages of PAGE_SIZE matches, best match
+# first, and follow next_cursor to the end without repeating a row.
+
+@pytest.fixture
+def settings():
+  return {'PAGE_SIZE': 2}
+
+@pytest.fixture
+def venues(app):
+  names = ['Hall of Jazz', 'Jazz Club', 'Blue Note', 'The Jazz Cellar', 'Park Stage']
+  cities = ['Springfield', 'Springfield', 'Jazzville', 'Shelbyville', 'Shelbyville']
+  for name, city in zip(names, cities):
+    db.session.add(Venue(name=name, city=city, state='1', genres=[11]))
+  db.session.commit()
+
+def search_pages(client, path, q):
+  pages, cursor = [], None
+  while True:
+    response = client.get(path, query_string={'q': q, **({'after': cursor} if cursor else {})})
+    assert response.status_code == 200
+    pages.append([venue['name'] for venue in response.json['data']])
+    cursor = response.json['next_cursor']
+    if not cursor:
+      return pages
+
+def test_search_is_paged(client, venues):
+  pages = search_pages(client, '/api/v1/venues/search', 'jazz')
+  assert [len(page) for page in pages] == [2, 2]
+  names = sum(pages, [])
+  assert sorted(names) == ['Blue Note', 'Hall of Jazz', 'Jazz Club', 'The Jazz Cellar']
+  # Name matches rank ahead of the city match
+  assert names[-1] == 'Blue Note'
+
+@pytest.mark.parametrize('path', ['/api/v1/venues/search', '/api/v1/artists/search'])
+@pytest.mark.parametrize('q', [None, '', '  '])
+def test_search_needs_a_term(client, path, q):
+  response = client.get(path, query_string={} if q is None else {'q': q})
+  assert response.status_code == 400
+
+def test_new_show_refreshes_the_artists_listing(client, venues):
+  artist = Artist(name='Quartet', city='Springfield', state='1', genres=[11])
+  db.session.add(artist)
+  db.session.commit()
+
+  def upcoming_shows():
+    return client.get('/api/v1/artists').json['data'][0]['num_upcoming_shows']
+
+  assert upcoming_shows() == 0
+  response = client.post('/shows/create', data={
+    'artist_id': str(artist.id), 'venue_id': '1', 'start_time': '2099-01-01 20:00:00'
+  })
+  assert b'successfully listed' in response.data
+  assert upcoming_shows() == 1
+
+def api_search(client, q):
+  return [venue['name'] for venue in client.get('/api/v1/venues/search', query_string={'q': q}).json['data']]
+
+def test_search_uses_the_full_text_index_on_sqlite(app, client, venues, statements):
+  if db.engine.dialect.name != 'sqlite':
+    pytest.skip('FTS5 is the SQLite search index')
+  assert api_search(client, 'cellar') == ['The Jazz Cellar']
+  assert any('MATCH' in statement for statement in statements)
+
+def test_search_index_follows_the_table(client, venues):
+  venue = Venue.query.filter_by(name='Park Stage').one()
+  venue.name = 'Park Bandstand'
+  db.session.commit()
+  assert api_search(client, 'bandstand') == ['Park Bandstand']
+  assert api_search(client, 'stage') == []
+
+  db.session.delete(venue)
+  db.session.commit()
+  assert api_search(client, 'bandstand') == []
+
+def test_short_terms_scan_the_table(client, venues):
+  # Too short for a trigram, still ranked with name matches first
+  names = sum(search_pages(client, '/api/v1/venues/search', 'ja'), [])
+  assert sorted(names[:3]) == ['Hall of Jazz', 'Jazz Club', 'The Jazz Cellar']
+  assert names[3:] == ['Blue Note']
+
+def test_search_page_counts_every_match_and_links_the_next_page(client, venues):
+  first = client.post('/venues/search', data={'search_term': 'jazz'}).get_data(as_text=True)
+  assert 'Number of search results for "jazz": 4' in first
+  cursor = re.search(r'name="after" value="([^"]+)"', first).group(1)
+
+  last = client.post('/venues/search', data={'search_term': 'jazz', 'after': cursor}).get_data(as_text=True)
+  assert 'Number of search results for "jazz": 4' in last
+  assert 'Blue Note' in last
+  assert 'name="after"' not in last
+
+def autocomplete(client, path, q):
+  return [result['name'] for result in client.get(path, query_string={'q': q}).json['results']]
+
+@pytest.mark.parametrize('q', ['jazz', 'JA', ' Jazz '])
+def test_autocomplete_matches_name_prefixes_ignoring_case(client, venues, q):
+  assert autocomplete(client, '/venues/autocomplete', q) == ['Jazz Club']
+
+def test_autocomplete_orders_by_name_and_escapes_wildcards(client, venues):
+  db.session.add_all([
+    Venue(name='Jazz_Bar', city='Springfield', state='1'),
+    Venue(name='jazz attic', city='Springfield', state='1'),
+    Artist(name='Jazz Trio', city='Springfield', state='1'),
+  ])
+  db.session.commit()
+  assert autocomplete(client, '/venues/autocomplete', 'jazz') == ['jazz attic', 'Jazz Club', 'Jazz_Bar']
+  assert autocomplete(client, '/venues/autocomplete', 'jazz_') == ['Jazz_Bar']
+  assert autocomplete(client, '/venues/autocomplete', '%') == []
+  assert autocomplete(client, '/venues/autocomplete', '') == []
+  assert autocomplete(client, '/artists/autocomplete', 'jazz t') == ['Jazz Trio']
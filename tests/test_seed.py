@@ -0,0 +1,22 @@
+import pytest
+import seed
+from models import Artist, ArtistGenre, Show, Venue, VenueGenre
+
+# `flask seed` with zero venues or artists inserts the rest and no shows.
+
+@pytest.mark.parametrize('venues, artists', [(0, 3), (3, 0), (0, 0)])
+def test_seed_without_venues_or_artists(app, venues, artists):
+  seed.seed(venues, artists, 5)
+  assert Venue.query.count() == venues
+  assert Artist.query.count() == artists
+  assert VenueGenre.query.count() >= venues
+  assert ArtistGenre.query.count() >= artists
+  assert Show.query.count() == 0
+
+def test_seed_adds_to_existing_rows(app):
+  seed.seed(2, 2, 4)
+  seed.seed(0, 2, 0, seed=1)
+  assert Venue.query.count() == 2
+  assert Artist.query.count() == 4
+  assert Show.query.count() == 4
+  assert all(artist.genres for artist in Artist.query)
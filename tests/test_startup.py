@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+# Workers and CLI commands pay for every module app.py imports. The import
+# of app must stay within IMPORT_BUDGET_MS (best of three runs), and the
+# heavy dependencies of a few code paths must not be imported by building
+# the app.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_BUDGET_MS', 1000))
+LAZY_MODULES = ['alembic', 'babel', 'dateutil', 'flask_migrate', 'flask_wtf', 'wtforms']
+
+def run_python(*args):
+  return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+def import_time_ms(module):
+  '''Cumulative import time of `module`, from python -X importtime.'''
+  for line in run_python('-X', 'importtime', '-c', f'import {module}').stderr.splitlines():
+    fields = line.removeprefix('import time:').split('|')
+    if len(fields) == 3 and fields[2].strip() == module:
+      return int(fields[1]) / 1000
+  raise AssertionError(f'No import time reported for {module}')
+
+def test_app_import_stays_within_budget():
+  best = min(import_time_ms('app') for _ in range(3))
+  assert best <= IMPORT_BUDGET_MS, f'importing app took {best:.0f} ms, budget {IMPORT_BUDGET_MS} ms'
+
+def test_building_the_app_leaves_heavy_imports_for_later():
+  output = run_python('-c', '''
+import sys
+from app import create_app
+from config import TestingConfig
+create_app(TestingConfig)
+print(' '.join(sorted(sys.modules)))
+''').stdout.split()
+  assert [module for module in LAZY_MODULES if module in output] == []
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+import pytest
+import seed
+import stats
+from extensions import db
+from models import Artist, ArtistStats, Show, Venue, VenueStats
+
+# venue_stats and artist_stats follow the shows through the app: a new show
+# adds to both counts, deleting a venue takes its shows out of its artists'
+# counts, and a rollover moves started shows from upcoming to past.
+
+@pytest.fixture
+def profiles(app):
+  seed.seed(2, 2, 0)
+
+def counts(model, id):
+  stats_model, key, _ = stats.stats_of(model)
+  row = db.session.query(stats_model.upcoming_count, stats_model.past_count).filter(key == id).first()
+  return tuple(row) if row else (0, 0)
+
+def create_show(client, venue_id, artist_id, start_time):
+  response = client.post('/shows/create', data={
+    'venue_id': venue_id, 'artist_id': artist_id, 'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S')
+  })
+  assert b'successfully listed' in response.data
+
+def test_new_shows_are_counted(client, profiles):
+  create_show(client, 1, 1, datetime(2099, 5, 1, 20))
+  create_show(client, 1, 2, datetime(2000, 5, 1, 20))
+  assert counts(Venue, 1) == (1, 1)
+  assert counts(Artist, 1) == (1, 0)
+  assert counts(Artist, 2) == (0, 1)
+  assert counts(Venue, 2) == (0, 0)
+
+def test_deleting_a_venue_takes_its_shows_out_of_its_artists_counts(client, profiles):
+  create_show(client, 1, 1, datetime(2099, 5, 1, 20))
+  create_show(client, 1, 1, datetime(2000, 5, 1, 20))
+  create_show(client, 2, 1, datetime(2099, 6, 1, 20))
+
+  assert client.delete('/venues/1').json == {'success': True}
+  assert counts(Artist, 1) == (1, 0)
+  assert db.session.query(ArtistStats.next_show_at).filter(ArtistStats.artist_id == 1).scalar() == datetime(2099, 6, 1, 20)
+  assert VenueStats.query.filter(VenueStats.venue_id == 1).count() == 0
+  assert Show.query.filter(Show.venue_id == 1).count() == 0
+
+def test_rollover_moves_started_shows_to_the_past(client, profiles):
+  create_show(client, 1, 1, datetime(2099, 5, 1, 20))
+  # As if the show had been booked for an hour ago
+  started = datetime.today() - timedelta(hours=1)
+  Show.query.update({Show.start_time: started})
+  VenueStats.query.update({VenueStats.next_show_at: started})
+  ArtistStats.query.update({ArtistStats.next_show_at: started})
+  db.session.commit()
+
+  assert stats.rollover() == 2
+  assert counts(Venue, 1) == (0, 1)
+  assert counts(Artist, 1) == (0, 1)
+  assert stats.rollover() == 0
@@ -0,0 +1,51 @@
+import re
+import pytest
+import seed
+from extensions import db
+from models import Venue
+
+# /venues reads every area, its venues and their upcoming show counts in
+# one statement, however many venues there are.
+VENUES_STATEMENTS = 1
+
+@pytest.fixture
+def settings():
+  # One page holds every venue, so each one is rendered
+  return {'PAGE_SIZE': 10000}
+
+def venues_statements(client, statements, venues):
+  statements.clear()
+  response = client.get('/venues')
+  assert response.status_code == 200
+  assert len(re.findall(rb'href="/venues/\d+"', response.data)) == venues
+  return len(statements)
+
+def test_venues_statement_count_does_not_grow_with_rows(client, statements):
+  seed.seed(50, 20, 200)
+  assert venues_statements(client, statements, 50) == VENUES_STATEMENTS
+
+  seed.seed(450, 20, 2000, seed=1)
+  assert venues_statements(client, statements, 500) == VENUES_STATEMENTS
+
+@pytest.mark.parametrize('settings', [{'PAGE_SIZE': 3}])
+def test_venue_pages_list_every_venue_once(client):
+  seed.seed(20, 5, 0)
+  # Venues listed before state and city were required
+  for name in ['No City', 'No Area']:
+    db.session.add(Venue(name=name, city='', state='' if name == 'No Area' else '5'))
+  db.session.commit()
+
+  ids, cursor = [], None
+  while True:
+    page = client.get('/api/v1/venues', query_string={'after': cursor} if cursor else {}).json
+    ids += [venue['id'] for venue in page['data']]
+    cursor = page['next_cursor']
+    if not cursor:
+      break
+  assert sorted(ids) == list(range(1, 23))
+  assert client.get('/venues').status_code == 200
+
+def test_venues_need_a_city_and_state(client):
+  response = client.post('/venues/create', data={'name': 'Nowhere Hall', 'genres': ['1']})
+  assert b'could not be listed' in response.data
+  assert Venue.query.filter_by(name='Nowhere Hall').count() == 0
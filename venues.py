@@ -0,0 +1,270 @@
+from itertools import groupby
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, url_for
+import aio
+import stats
+from browsing import render_browse
+from cache import conditional
+from enums import genre_names, state_name
+from extensions import cache, db
+from filters import format_datetime
+from invalidation import invalidate_venue, touch_venue_artists, venue_validators
+from models import Venue
+from queries import (
+  autocomplete, search, search_count, shows_page, shows_page_rows, upcoming_shows_counts,
+  venue_detail_queries, venue_shows_query, venues_page
+)
+from routing import read_only
+
+bp = Blueprint('venues', __name__)
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+@cache.cached('venues')
+def venues():
+  page = venues_page(request.args.get('after'))
+
+  data=[]
+  for location, rows in groupby(page.items, key=lambda row: (row.city, row.state)):
+    data.append({
+      "city": location[0],
+      # Venues from before state was required have an empty one
+      "state": state_name(location[1]) or '',
+      "venues": [{
+        "id": row.id,
+        "name": row.name,
+        "num_upcoming_shows": row.num_upcoming_shows,
+      } for row in rows]
+    })
+
+  return render_template('pages/venues.html', areas=data, next_cursor=page.next_cursor)
+
+@bp.route('/venues/search', methods=['POST'])
+@read_only
+def search_venues():
+  search_term = request.form.get('search_term', '')
+
+  page = search(Venue, search_term, request.form.get('after'))
+  venues = page.items
+  shows_counts = upcoming_shows_counts(Venue, [venue.id for venue in venues])
+  
+  data = []
+  for venue in venues:
+    data.append({
+      "id": venue.id,
+      "name": venue.name,
+      "num_upcoming_shows": shows_counts.get(venue.id, 0)
+    })
+
+  response={
+    "count": search_count(Venue, search_term),
+    "data": data
+  }
+  return render_template(
+    'pages/search_venues.html', results=response, search_term=search_term, next_cursor=page.next_cursor
+  )
+
+@bp.route('/venues/autocomplete')
+def autocomplete_venues():
+  '''Venues whose name starts with ?q=, for the show form.'''
+  prefix = request.args.get('q', '').strip()
+  results = autocomplete(Venue, prefix) if prefix else []
+  return jsonify(results=[{"id": id, "name": name} for id, name in results])
+
+@bp.route('/venues/<int:venue_id>')
+@conditional(venue_validators)
+@cache.cached('venue:{venue_id}')
+def show_venue(venue_id):
+  rows, upcoming_shows, past_shows = aio.fetch_all(*venue_detail_queries(venue_id))
+
+  if not rows:
+    abort(404)
+
+  venue = rows[0]
+  upcoming_shows = shows_page_rows(upcoming_shows)
+  past_shows = shows_page_rows(past_shows)
+
+  data = {
+    "id": venue.id,
+    "name": venue.name,
+    "genres": genre_names(venue.genres_mask),
+    "address": venue.address,
+    "city": venue.city,
+    "state": venue.state,
+    "phone": venue.phone,
+    "website": venue.website,
+    "facebook_link": venue.facebook_link,
+    "seeking_talent": Venue.seeking_talent,
+    "seeking_description": venue.seeking_description,
+    "image_link": venue.image_link,
+    "past_shows": [venue_show_data(show) for show in past_shows.items],
+    "upcoming_shows": [venue_show_data(show) for show in upcoming_shows.items],
+    "past_shows_count": venue.past_shows_count,
+    "upcoming_shows_count": venue.upcoming_shows_count,
+    "past_shows_cursor": past_shows.next_cursor,
+    "upcoming_shows_cursor": upcoming_shows.next_cursor,
+  }
+
+  return render_template('pages/show_venue.html', venue=data)
+
+def venue_show_data(show):
+  return {
+    "artist_id": show.artist_id,
+    "artist_name": show.artist_name,
+    "artist_image_link": show.artist_image_link,
+    "start_time": show.start_time
+  }
+
+@bp.route('/venues/<int:venue_id>/shows/<any(upcoming, past):when>')
+@conditional(venue_validators)
+@cache.cached('venue:{venue_id}')
+def venue_shows(venue_id, when):
+  page = shows_page(venue_shows_query(venue_id), when, request.args.get('after'))
+
+  return jsonify(
+    shows=[{
+      "url": url_for('artists.show_artist', artist_id=show.artist_id),
+      "name": show.artist_name,
+      "image_link": show.artist_image_link,
+      "start_time": format_datetime(show.start_time, 'full')
+    } for show in page.items],
+    next_cursor=page.next_cursor
+  )
+
+@bp.route('/venues/browse')
+def browse_venues():
+  return render_browse(Venue, lambda id: url_for('venues.show_venue', venue_id=id), 'Venues', 'Seeking talent')
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+  from forms import VenueForm
+  form = VenueForm()
+  return render_template('forms/new_venue.html', form=form)
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+  try:
+    name = request.form.get('name')
+    city = request.form.get('city')
+    state = request.form.get('state')
+    address = request.form.get('address')
+    phone = request.form.get('phone')
+    image_link = request.form.get('image_link')
+    genres = request.form.getlist('genres')
+    facebook_link = request.form.get('facebook_link')
+    website = request.form.get('website')
+    seeking_talent = request.form.get('seeking_talent')
+    seeking_description = request.form.get('seeking_description')
+
+    venue = Venue(
+      name=name, 
+      city=city,
+      state=state, 
+      address=address, 
+      phone=phone, 
+      image_link=image_link,
+      genres=genres, 
+      facebook_link=facebook_link,
+      website=website,
+      seeking_talent=seeking_talent,
+      seeking_description=seeking_description
+    )
+
+    db.session.add(venue)
+    db.session.commit()
+    cache.invalidate('venues')
+
+    flash('Venue ' + request.form['name'] + ' was successfully listed!')
+
+  except:
+    db.session.rollback()
+    flash(f'An error occurred. Venue {name} could not be listed.')
+
+  return render_template('pages/home.html')
+
+@bp.route('/venues/<venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+  
+  try:
+    venue = db.session.get(Venue, venue_id)
+
+    if not venue:
+      abort(404)
+
+    touch_venue_artists(venue_id)
+    artist_ids = stats.remove_shows(Venue, venue_id)
+    stats.forget(Venue, venue_id)
+    db.session.delete(venue)
+    db.session.commit()
+    invalidate_venue(venue_id, artist_ids)
+
+    return jsonify(success=True)
+  except:
+    db.session.rollback()
+    return jsonify(success=False)
+
+#  Update
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+  venue = db.session.get(Venue, venue_id)
+
+  if not venue:
+    abort(404)
+
+  from forms import VenueForm
+  form = VenueForm()
+  venue={
+    "id": venue.id,
+    "name": venue.name,
+    "genres": [genre.value for genre in venue.genres],
+    "address": venue.address,
+    "city": venue.city,
+    "state": venue.state,
+    "phone": venue.phone,
+    "website": venue.website,
+    "facebook_link": venue.facebook_link,
+    "seeking_talent": venue.seeking_talent,
+    "seeking_description": venue.seeking_description,
+    "image_link": venue.image_link
+  }
+  
+  return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+  try:
+    venue = db.session.get(Venue, venue_id)
+
+    if not venue:
+      abort(404)
+
+    venue.name = request.form.get("name")    
+    venue.city = request.form.get("city")
+    venue.state = request.form.get("state")
+    venue.address = request.form.get("address")
+    venue.phone = request.form.get("phone")
+    venue.image_link = request.form.get("image_link")
+    venue.facebook_link = request.form.get("facebook_link")
+    venue.genres = request.form.getlist("genres")
+    venue.website = request.form.get("website")
+    venue.seeking_talent = request.form.get("seeking_talent") == 'y'
+    venue.seeking_description = request.form.get("seeking_description")
+    touch_venue_artists(venue_id)
+
+    db.session.commit()
+    invalidate_venue(venue_id)
+
+    flash(f"Venue { venue.name } was updated")
+
+  except:
+    db.session.rollback()
+
+    flash(f'An error occurred. Venue {venue.name} could not be updated.')
+
+  return redirect(url_for('venues.show_venue', venue_id=venue_id))